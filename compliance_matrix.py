@@ -28,6 +28,7 @@ from pathlib import Path
 import pandas as pd
 
 from utils.constants import COLUMNS
+from utils.io_helpers import get_excel_engine
 from utils.tracer.config import load_config, TracerConfig, SourceEntry, slugify_label
 
 log = logging.getLogger(__name__)
@@ -40,7 +41,7 @@ def _load_df(path: Path, sheet: str | None = None) -> pd.DataFrame:
     suffix = path.suffix.lower()
     if suffix in (".xlsx", ".xls", ".xlsm"):
         kwargs = {"sheet_name": sheet} if sheet else {}
-        df = pd.read_excel(path, dtype=str, **kwargs)
+        df = pd.read_excel(path, dtype=str, engine=get_excel_engine(), **kwargs)
     elif suffix == ".csv":
         df = pd.read_csv(path, dtype=str, sep=";")
         if df.shape[1] == 1:
@@ -126,8 +127,9 @@ def _extract_rows(
     """
     rows = ancestry[ancestry["RequirementID"].str.strip().isin(req_ids)].copy()
     missing = [c for c in OUTPUT_COLS if c not in ancestry.columns]
+    if missing:
+        rows = rows.reindex(columns=[*rows.columns, *missing], fill_value="")
     for m in missing:
-        rows[m] = ""
         log.warning("Column %r missing from ancestry — blanked in output", m)
 
     # Restore Definition from the original source document
@@ -171,9 +173,7 @@ def _extract_rows(
             if found_in_level:
                 extra = source_df[
                     source_df["RequirementID"].str.strip().isin(found_in_level)
-                ].copy()
-                for m in [c for c in OUTPUT_COLS if c not in extra.columns]:
-                    extra[m] = ""
+                ].reindex(columns=OUTPUT_COLS, fill_value="")
                 extra = extra[
                     ~(
                         (extra["RequirementID"].str.strip() == "")
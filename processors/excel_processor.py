@@ -4,13 +4,27 @@ Handles .xlsx, .xls, .xlsm, and .csv files with interactive column mapping.
 """
 
 import pandas as pd
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Tuple, Optional, Union
+from typing import Callable, Dict, List, Sequence, Tuple, Optional, Union
 
-from utils.base_processor import BaseProcessor, Requirement
-from utils.constants import COLUMNS, COLUMN_MAPPING
-from utils.text_processing import clean_cell_value
-from utils.io_helpers import debug_input
+from utils.base_processor import BaseProcessor, Requirement, REQUIREMENT_FIELD_COLUMNS
+from utils.constants import COLUMNS, COLUMN_MAPPING, COLUMN_MAPPING_KEYS
+from utils.text_processing import clean_series
+from utils.io_helpers import InteractiveInputRequired, debug_input, get_excel_engine, get_string_dtype
+
+# Target column menu cells, formatted once as (normal, dimmed) pairs
+_MENU_CELLS = [
+    (f"{num:2d}. {name:<20}", f"\033[2m{num:2d}. {name:<20}\033[0m")
+    for num, name in enumerate(COLUMNS, 1)
+]
+
+# Quote characters removed from source headers (straight and smart quotes)
+_HEADER_QUOTES = str.maketrans("", "", '"\u201c\u201d')
+
+# Automatic mapping plans keyed by the standardized header tuple, so files
+# sharing a layout skip the COLUMN_MAPPING lookups: ([(src, tgt)], [unmapped])
+_AUTO_MAPPING_PLANS = {}
 
 
 class ExcelProcessor(BaseProcessor):
@@ -25,6 +39,15 @@ class ExcelProcessor(BaseProcessor):
     - Cache previous user choices
     """
     
+    # Lowercase file extension -> loader method name
+    _LOADERS = {
+        ".xls": "_load_excel",
+        ".xlsx": "_load_excel",
+        ".xlsm": "_load_excel",
+        ".csv": "_load_csv",
+        ".csv_semicolon": "_load_csv",
+    }
+    
     def extract_requirements(
         self,
         input_path: Path,
@@ -44,13 +67,53 @@ class ExcelProcessor(BaseProcessor):
             List of Requirement objects
         """
         input_path = Path(input_path)
+        probe = {}
+        
+        def map_headers(headers):
+            # Answer the mapping questions from the header row alone, before
+            # the full sheet is parsed
+            frame = self._prepare_columns(pd.DataFrame(columns=headers), id_template)
+            probe["columns"] = list(frame.columns)
+            probe["targets"] = self._resolve_column_mapping(frame.columns, input_path)
         
         # Load DataFrame with sheet selection if needed
-        df = self._load_spreadsheet(input_path, sheet_name=sheet_name)
+        df = self._load_spreadsheet(input_path, sheet_name=sheet_name, on_headers=map_headers)
         
         if df is None:
             return []
         
+        df = self._prepare_columns(df, id_template)
+        
+        # Map columns to target schema, reusing the probe's answers; only
+        # columns the probe could not see (data rows wider than the header
+        # row) are resolved here, so no column is asked about twice
+        if "columns" not in probe:
+            assigned_targets = self._resolve_column_mapping(df.columns, input_path)
+        else:
+            probed = set(probe["columns"])
+            assigned_targets = {
+                tgt: src for tgt, src in probe["targets"].items() if src in df.columns
+            }
+            unseen = [col for col in df.columns if col not in probed]
+            if unseen:
+                assigned_targets = self._resolve_column_mapping(unseen, input_path, assigned_targets)
+        df = self._apply_column_mapping(df, assigned_targets)
+        
+        # Convert to Requirements
+        return self._dataframe_to_requirements(df)
+    
+    def _prepare_columns(self, df: pd.DataFrame, id_template: Optional[str] = None) -> pd.DataFrame:
+        """
+        Synthesise RequirementID from id_template (if given) and standardize
+        the column names.
+        
+        Args:
+            df: Raw DataFrame (may be header-only)
+            id_template: Optional RequirementID template
+            
+        Returns:
+            DataFrame with standardized column names
+        """
         if id_template:
             col_lk = {c.lower(): c for c in df.columns}
             import re as _re
@@ -63,18 +126,13 @@ class ExcelProcessor(BaseProcessor):
             df["RequirementID"] = ids
         
         # Standardize column names
-        df = self._standardize_columns(df)
-        
-        # Map columns to target schema
-        df = self._map_columns(df, input_path)
-        
-        # Convert to Requirements
-        return self._dataframe_to_requirements(df)
+        return self._standardize_columns(df)
     
     def _load_spreadsheet(
         self,
         input_path: Path,
         sheet_name: Optional[str] = None,
+        on_headers: Optional[Callable[[List[str]], None]] = None,
     ) -> Union[pd.DataFrame, None]:
         """
         Load spreadsheet with multi-sheet handling.
@@ -82,28 +140,62 @@ class ExcelProcessor(BaseProcessor):
         Args:
             input_path: Path to file
             sheet_name: Optional sheet override for Excel files
+            on_headers: Optional callback given the header row before a sheet
+                        is parsed in full
             
         Returns:
             DataFrame or None if unsupported type
         """
         ext = input_path.suffix.lower()
+        loader = self._LOADERS.get(ext)
         
-        if ext in [".xls", ".xlsx", ".xlsm"]:
-            result = self._load_excel_with_sheet_selection(
-                input_path,
-                sheet_name=sheet_name,
-            )
-            return result if result is not None else pd.DataFrame()
-        elif ext == ".csv" or ext.lower() == ".csv_semicolon":
-            return pd.read_csv(input_path, encoding="utf-8", quotechar='"', sep=";", engine='python', on_bad_lines='warn')
-        else:
+        if loader is None:
             print(f"Unsupported file type: {ext}")
             return pd.DataFrame()
+        return getattr(self, loader)(input_path, sheet_name, on_headers)
+    
+    def _load_excel(
+        self,
+        input_path: Path,
+        sheet_name: Optional[str] = None,
+        on_headers: Optional[Callable[[List[str]], None]] = None,
+    ) -> pd.DataFrame:
+        """Load an Excel workbook (empty DataFrame if sheet selection is cancelled)."""
+        result = self._load_excel_with_sheet_selection(
+            input_path,
+            sheet_name=sheet_name,
+            on_headers=on_headers,
+        )
+        return result if result is not None else pd.DataFrame()
+    
+    def _load_csv(
+        self,
+        input_path: Path,
+        sheet_name: Optional[str] = None,
+        on_headers: Optional[Callable[[List[str]], None]] = None,
+    ) -> pd.DataFrame:
+        """Load a semicolon-separated CSV file (sheet_name and on_headers are ignored)."""
+        # pandas' C parser is several times faster than the python engine
+        # and, like it, pads short rows (exports often cut off trailing
+        # empty fields) with NaN; the pyarrow reader drops such rows.
+        # Every column is read as text without type inference (IDs such
+        # as "007" stay verbatim), into Arrow-backed strings when available
+        string_dtype = get_string_dtype()
+        return pd.read_csv(
+            input_path,
+            encoding="utf-8",
+            quotechar='"',
+            sep=";",
+            engine="c",
+            on_bad_lines='warn',
+            dtype=str if string_dtype is object else string_dtype,
+        )
     
     def _load_excel_with_sheet_selection(
         self,
         input_path: Path,
         sheet_name: Optional[str] = None,
+        on_headers: Optional[Callable[[List[str]], None]] = None,
     ) -> Optional[pd.DataFrame]:
         """
         Load Excel file with interactive sheet selection if multiple sheets.
@@ -113,44 +205,118 @@ class ExcelProcessor(BaseProcessor):
         Args:
             input_path: Path to Excel file
             sheet_name: Optional sheet override for non-interactive loading
+            on_headers: Optional callback given the header row before the
+                        selected sheet is parsed in full
             
         Returns:
             DataFrame from selected sheet or None if cancelled
         """
-        excel_file = pd.ExcelFile(input_path)
-        sheet_names : List[str] = [str(name) for name in excel_file.sheet_names]
+        # The workbook is opened at most once, and only if the cache cannot
+        # answer: a cached workbook lists its sheets and the selected sheet
+        # is loaded from Parquet without the workbook being parsed
+        with ExitStack() as stack:
+            opened = []
+            
+            def open_workbook() -> pd.ExcelFile:
+                if not opened:
+                    opened.append(stack.enter_context(
+                        pd.ExcelFile(input_path, engine=get_excel_engine())
+                    ))
+                return opened[0]
+            
+            sheet_names = self.cache.get_sheet_names(str(input_path)) if self.cache else None
+            if sheet_names is None:
+                sheet_names = [str(name) for name in open_workbook().sheet_names]
 
-        if sheet_name:
-            if sheet_name not in sheet_names:
-                raise ValueError(
-                    f"Sheet '{sheet_name}' not found in {input_path}. "
-                    f"Available sheets: {sheet_names}"
-                )
-            print(f"\nUsing configured sheet selection: '{sheet_name}'")
-            return pd.read_excel(input_path, sheet_name=sheet_name)
-        
-        if len(sheet_names) == 1:
-            # Only one sheet, read directly
-            return pd.read_excel(input_path)
+            if sheet_name:
+                if sheet_name not in sheet_names:
+                    raise ValueError(
+                        f"Sheet '{sheet_name}' not found in {input_path}. "
+                        f"Available sheets: {sheet_names}"
+                    )
+                print(f"\nUsing configured sheet selection: '{sheet_name}'")
+                return self._read_sheet(open_workbook, input_path, sheet_name, on_headers)
+            
+            if len(sheet_names) == 1:
+                # Only one sheet, read directly
+                return self._read_sheet(open_workbook, input_path, sheet_names[0], on_headers)
+            
+            # Multiple sheets - check cache first
+            cached_choices = self.cache.get_choices(str(input_path)) if self.cache else {}
+            
+            if 'sheet_name' in cached_choices and cached_choices['sheet_name'] in sheet_names:
+                selected_sheet = cached_choices['sheet_name']
+                print(f"\nUsing cached sheet selection: '{selected_sheet}' [from cache]")
+            else:
+                selected_sheet = self._prompt_for_sheet(input_path, sheet_names)
+            
+                # Save sheet selection to cache
+                if self.cache and selected_sheet:
+                    self.cache.save_choices(str(input_path), sheet_name=selected_sheet)
+            
+            if not selected_sheet:
+                return None
+            
+            print(f"Reading sheet: '{selected_sheet}'")
+            return self._read_sheet(open_workbook, input_path, selected_sheet, on_headers)
+    
+    def _read_sheet(
+        self,
+        open_workbook: Callable[[], pd.ExcelFile],
+        input_path: Path,
+        sheet_name: str,
+        on_headers: Optional[Callable[[List[str]], None]] = None,
+    ) -> pd.DataFrame:
+        """
+        Read one sheet as strings.
         
-        # Multiple sheets - check cache first
-        cached_choices = self.cache.get_choices(str(input_path)) if self.cache else {}
+        Parsed sheets are cached as Parquet (via FileCache) and reused while
+        the file is unchanged; the workbook is only opened on a cache miss.
         
-        if 'sheet_name' in cached_choices and cached_choices['sheet_name'] in sheet_names:
-            selected_sheet = cached_choices['sheet_name']
-            print(f"\nUsing cached sheet selection: '{selected_sheet}' [from cache]")
-        else:
-            selected_sheet = self._prompt_for_sheet(input_path, sheet_names)
+        Args:
+            open_workbook: Returns the open workbook handle (opening it on
+                           first call)
+            input_path: Path to Excel file
+            sheet_name: Sheet to read
+            on_headers: Optional callback given the header row before the
+                        sheet is parsed in full
             
-            # Save sheet selection to cache
-            if self.cache and selected_sheet:
-                self.cache.save_choices(str(input_path), sheet_name=selected_sheet)
+        Returns:
+            DataFrame with all cells as str (empty cells as NaN)
+        """
+        # Reuse the sheet parsed by an earlier run if the file is unchanged
+        if self.cache:
+            cached = self.cache.load_sheet(str(input_path), sheet_name)
+            if cached is not None:
+                return cached
+        
+        excel_file = open_workbook()
+        if on_headers is not None:
+            on_headers(self._peek_headers(excel_file, sheet_name))
+        
+        df = excel_file.parse(sheet_name=sheet_name, dtype=str)
+        
+        if self.cache:
+            self.cache.save_sheet(
+                str(input_path),
+                sheet_name,
+                df,
+                sheet_names=[str(name) for name in excel_file.sheet_names],
+            )
+        return df
+    
+    def _peek_headers(self, excel_file: pd.ExcelFile, sheet_name: str) -> List[str]:
+        """
+        Read only the header row of a sheet (both readers stop after it).
         
-        if not selected_sheet:
-            return None
+        Args:
+            excel_file: Open workbook handle
+            sheet_name: Sheet to probe
             
-        print(f"Reading sheet: '{selected_sheet}'")
-        return pd.read_excel(input_path, sheet_name=selected_sheet)
+        Returns:
+            Column names as read_excel would produce them
+        """
+        return list(excel_file.parse(sheet_name=sheet_name, nrows=0, dtype=str).columns)
     
     def _prompt_for_sheet(self, input_path: Path, sheet_names: List[str]) -> Optional[str]:
         """
@@ -201,13 +367,16 @@ class ExcelProcessor(BaseProcessor):
             except KeyboardInterrupt:
                 print("\nOperation cancelled by user.")
                 return None
+            except InteractiveInputRequired:
+                raise
             except Exception as e:
                 print(f"Invalid input: {e}")
                 continue
     
     def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Standardize column names: lowercase, strip, remove quotes.
+        Standardize column names: lowercase, strip, remove (smart) quotes and
+        collapse runs of whitespace (e.g. wrapped "Req\\nID" headers).
         
         Args:
             df: Input DataFrame
@@ -215,39 +384,58 @@ class ExcelProcessor(BaseProcessor):
         Returns:
             DataFrame with standardized column names
         """
-        df.columns = [c.strip().lower().replace('"', '') for c in df.columns]
+        df.columns = (
+            df.columns.astype(str)
+            .str.strip()
+            .str.lower()
+            .str.translate(_HEADER_QUOTES)
+            .str.replace(r'\s+', ' ', regex=True)
+        )
         return df
     
-    def _map_columns(self, df: pd.DataFrame, input_path: Path) -> pd.DataFrame:
+    def _resolve_column_mapping(
+        self,
+        columns: Sequence[str],
+        input_path: Path,
+        assigned_targets: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, str]:
         """
-        Map source columns to target COLUMNS schema.
+        Decide which source column feeds each target column.
         
         Uses automatic mapping first, then interactive for unmapped columns.
+        Only the column names are needed, so this can run on a header probe.
         
         Args:
-            df: DataFrame with source columns
+            columns: Standardized source column names
             input_path: File path (for caching)
+            assigned_targets: Optional assignments already made for other
+                              columns of the same sheet
             
         Returns:
-            DataFrame with target columns
+            Dict of {target_col: source_col}
         """
-        mapped_df = pd.DataFrame(columns=COLUMNS)
-        unmapped_columns = []
-        assigned_targets = {}  # Track which targets are already assigned
+        # Track which targets are already assigned
+        assigned_targets = dict(assigned_targets or {})
         
         # Load cached column mappings
         cached_choices = self.cache.get_choices(str(input_path)) if self.cache else {}
         cached_mappings = cached_choices.get('column_mappings', {})
         
-        # First pass: automatic mapping
-        for src_col in df.columns:
-            if src_col in COLUMN_MAPPING:
-                tgt_col = COLUMN_MAPPING[src_col]
-                print(f"Mapping column '{src_col}' to '{tgt_col}'")
-                mapped_df[tgt_col] = df[src_col].apply(clean_cell_value)
-                assigned_targets[tgt_col] = src_col
-            else:
-                unmapped_columns.append(src_col)
+        # First pass: automatic mapping (one frozenset test per header,
+        # reused for later files with the same header)
+        signature = tuple(columns)
+        plan = _AUTO_MAPPING_PLANS.get(signature)
+        if plan is None:
+            plan = _AUTO_MAPPING_PLANS[signature] = ([], [])
+            for src in signature:
+                if src in COLUMN_MAPPING_KEYS:
+                    plan[0].append((src, COLUMN_MAPPING[src]))
+                else:
+                    plan[1].append(src)
+        auto_assignments, unmapped_columns = plan
+        for src_col, tgt_col in auto_assignments:
+            print(f"Mapping column '{src_col}' to '{tgt_col}'")
+            assigned_targets[tgt_col] = src_col
         
         # Second pass: handle unmapped columns
         if unmapped_columns:
@@ -267,7 +455,6 @@ class ExcelProcessor(BaseProcessor):
                         continue
                     elif cached_target in COLUMNS:
                         print(f"\nUsing cached mapping for '{src_col}' --> '{cached_target}' [from cache]")
-                        mapped_df[cached_target] = df[src_col].apply(clean_cell_value)
                         user_column_mappings[src_col] = cached_target
                         assigned_targets[cached_target] = src_col
                         continue
@@ -281,7 +468,6 @@ class ExcelProcessor(BaseProcessor):
                 if should_skip:
                     user_column_mappings[src_col] = 'skip'
                 else:
-                    mapped_df[target_col] = df[src_col].apply(clean_cell_value)
                     user_column_mappings[src_col] = target_col
                     assigned_targets[target_col] = src_col
             
@@ -289,19 +475,33 @@ class ExcelProcessor(BaseProcessor):
             if self.cache and user_column_mappings:
                 self.cache.save_choices(str(input_path), column_mappings=user_column_mappings)
             
-            mapped_count = len(df.columns) - len(unmapped_columns)
+            mapped_count = len(columns) - len(unmapped_columns)
             print(f"\nMapping Summary: {mapped_count} columns mapped automatically, "
                   f"{len(unmapped_columns)} columns processed interactively")
         else:
             print("All columns were successfully mapped automatically.")
         
-        # Ensure all target columns exist
-        for col in COLUMNS:
-            if col not in mapped_df.columns:
-                mapped_df[col] = ""
+        return assigned_targets
+    
+    def _apply_column_mapping(self, df: pd.DataFrame, assigned_targets: Dict[str, str]) -> pd.DataFrame:
+        """
+        Build the target-schema DataFrame from resolved column assignments.
         
-        # Reorder to match COLUMNS
-        return mapped_df[COLUMNS]
+        Args:
+            df: DataFrame with source columns
+            assigned_targets: Dict of {target_col: source_col}
+            
+        Returns:
+            DataFrame with target columns
+        """
+        if not assigned_targets:
+            return pd.DataFrame(columns=COLUMNS)
+        
+        # Select, rename and clean all assigned columns (one vectorized pass
+        # per column), then add the missing targets and reorder with one reindex
+        rename_map = {src: tgt for tgt, src in assigned_targets.items()}
+        mapped_df = df[list(rename_map)].rename(columns=rename_map).apply(clean_series)
+        return mapped_df.reindex(columns=COLUMNS, fill_value="")
     
     def _display_column_mapping_menu(
         self, 
@@ -328,23 +528,13 @@ class ExcelProcessor(BaseProcessor):
         print(f"\nAvailable target columns:")
         print(f"  {DIM}(Dimmed = already assigned){RESET}")
         
-        # Display columns in 4-column grid
+        # Display columns in 4-column grid (dimmed if already mapped)
         rows_per_col = 6
         for row_idx in range(0, rows_per_col):
-            row_items = []
-            for col_idx in range(0, len(COLUMNS), rows_per_col):
-                if row_idx + col_idx < len(COLUMNS):
-                    col_num = row_idx + col_idx + 1
-                    col_name = COLUMNS[row_idx + col_idx]
-                    
-                    # Dim if already mapped
-                    if col_name in already_mapped:
-                        item = f"{DIM}{col_num:2d}. {col_name:<20}{RESET}"
-                    else:
-                        item = f"{col_num:2d}. {col_name:<20}"
-                    
-                    row_items.append(item)
-            
+            row_items = [
+                _MENU_CELLS[idx][COLUMNS[idx] in already_mapped]
+                for idx in range(row_idx, len(COLUMNS), rows_per_col)
+            ]
             print("  " + " ".join(row_items))
         
         # Show current mappings
@@ -424,29 +614,6 @@ class ExcelProcessor(BaseProcessor):
         Returns:
             List of Requirement objects
         """
-        requirements = []
-        
-        for _, row in df.iterrows():
-            req = Requirement(
-                requirement_id=row.get("RequirementID", ""),
-                parent_id=row.get("ParentID", ""),
-                type=row.get("Type", ""),
-                sub_type=row.get("SubType", ""),
-                title=row.get("Title", ""),
-                definition=row.get("Definition", ""),
-                notes=row.get("Notes", ""),
-                remarks=row.get("Remarks", ""),
-                responsibility=row.get("Responsibility", ""),
-                subsystem_applicability=row.get("SubSysApplicability", ""),
-                applicability=row.get("Applicability", ""),
-                compliance=row.get("Compliance", ""),
-                compliance_notes=row.get("ComplianceNotes", ""),
-                verification=row.get("Verification", ""),
-                verification_notes=row.get("VerificationNotes", ""),
-                reference_document=row.get("ReferenceDocument", ""),
-                original_esa_identifier=row.get("OriginalESAIdentifier", ""),
-                updates_made=row.get("UpdatesMade", ""),
-            )
-            requirements.append(req)
-        
-        return requirements
+        # One object array in field order; missing columns become ""
+        rows = df.reindex(columns=REQUIREMENT_FIELD_COLUMNS, fill_value="").to_numpy(dtype=object)
+        return [Requirement(*row) for row in rows.tolist()]
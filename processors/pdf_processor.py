@@ -3,8 +3,12 @@ PDF processor for requirements extraction.
 Handles .pdf files with keyword-based parsing.
 """
 
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List
 
 try:
     import pymupdf
@@ -13,7 +17,22 @@ except ImportError:
 
 from utils.base_processor import BaseProcessor, Requirement
 from utils.constants import PDF_KEYWORDS
-from utils.text_processing import normalize_unicode_text, normalize_whitespace
+from utils.text_processing import normalize_unicode_text
+
+
+# Joins page texts for document-wide normalization (kept as-is by NFKD/ASCII)
+_PAGE_SEPARATOR = "\x00"
+
+
+def _extract_page_texts(pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract raw text of pages [start, stop) in a worker process.
+    
+    MuPDF documents cannot be shared between threads, so each worker opens
+    its own handle.
+    """
+    with pymupdf.open(pdf_path) as doc:
+        return [doc[i].get_text("text") for i in range(start, stop)]
 
 
 class PDFProcessor(BaseProcessor):
@@ -30,6 +49,45 @@ class PDFProcessor(BaseProcessor):
     # Keywords that trigger requirement block parsing
     KEYWORDS = PDF_KEYWORDS
     
+    # Length of the running page header skipped at the top of every page
+    HEADER_CHARS = 120
+    
+    # Documents with at least this many pages are extracted in parallel
+    PARALLEL_MIN_PAGES = 64
+    
+    # All keywords as one alternation (longest first), so each line is
+    # scanned once in C instead of once per keyword
+    _KEYWORD_RE = re.compile(
+        "|".join(re.escape(k) for k in sorted(KEYWORDS, key=len, reverse=True))
+    )
+    # Keyword precedence when a line contains several (first listed wins)
+    _KEYWORD_RANK = {k: i for i, k in enumerate(KEYWORDS)}
+    # Every keyword ends in " :"; lines without it (most continuation
+    # lines) are rejected by one substring test before the regex runs
+    _KEYWORD_MARKER = " :"
+    # PDF fields collected for every requirement block
+    _BLOCK_FIELDS = (
+        "requirement_id", "type", "definition", "source", "verification",
+        "compliance", "allocation", "comments", "compliance_comment",
+    )
+    # Keyword -> (field, field that following continuation lines extend)
+    _KEYWORD_TARGETS = {
+        k: (field, {"type": "definition", "comments": "comments"}.get(field))
+        for k, field in KEYWORDS.items()
+    }
+    
+    def __init__(self, cache=None, parallel_pages: bool = True):
+        """
+        Initialize processor.
+        
+        Args:
+            cache: FileCache instance for storing user choices
+            parallel_pages: Extract large documents in worker processes
+                            (False when already running inside a worker)
+        """
+        super().__init__(cache)
+        self.parallel_pages = parallel_pages
+    
     def extract_requirements(self, input_path: Path) -> List[Requirement]:
         """
         Extract requirements from PDF file.
@@ -45,15 +103,10 @@ class PDFProcessor(BaseProcessor):
         # Extract text from PDF
         lines = self._extract_pdf_text(input_path)
         
-        # Group lines into requirement blocks
-        blocks = self._group_requirement_blocks(lines)
-        
-        # Parse each block into a Requirement
-        requirements = [self._parse_requirement_block(block) for block in blocks]
-        
-        return requirements
+        # Group and parse in the same pass over the lines
+        return list(self._parse_requirement_blocks(lines))
     
-    def _extract_pdf_text(self, input_path: Path) -> List[str]:
+    def _extract_pdf_text(self, input_path: Path) -> Iterator[str]:
         """
         Extract and normalize text lines from PDF.
         
@@ -61,113 +114,141 @@ class PDFProcessor(BaseProcessor):
             input_path: Path to PDF file
             
         Returns:
-            List of text lines (cleaned and normalized)
+            Iterator over text lines (cleaned and normalized), produced
+            lazily so only the block being grouped is kept
         """
-        doc = pymupdf.open(str(input_path))
-        all_lines = []
+        pages = self._extract_page_texts(input_path)
         
-        for page in doc:
-            text = page.get_text()
-            
-            # Normalize Unicode characters
-            text = normalize_unicode_text(text)
-            
-            # Skip header (first 120 chars) and split into lines
-            lines = text[120:].split("\n")
-            
-            # Clean each line: collapse whitespace, strip, filter empty
-            cleaned_lines = [
-                normalize_whitespace(line)
-                for line in lines
-                if line.strip()
-            ]
-            
-            all_lines.extend(cleaned_lines)
+        # Normalize Unicode characters for the whole document in one call,
+        # joining pages on NUL (which extracted text practically never holds).
+        # Pure-ASCII documents (and pages) are already normalized.
+        if not all(text.isascii() for text in pages):
+            if any(_PAGE_SEPARATOR in text for text in pages):
+                pages = [text if text.isascii() else normalize_unicode_text(text) for text in pages]
+            else:
+                pages = normalize_unicode_text(_PAGE_SEPARATOR.join(pages)).split(_PAGE_SEPARATOR)
         
-        doc.close()
-        return all_lines
+        # Skip each page's header (first HEADER_CHARS chars), then split the
+        # remaining text of all pages in one go; page boundaries become line
+        # breaks, so every page still contributes whole lines
+        header_chars = self.HEADER_CHARS
+        body = "\n".join(text[header_chars:] for text in pages)
+        
+        # Drop blank lines and collapse whitespace as the lines are consumed
+        # (one split() per line serves both, as in normalize_whitespace)
+        return (" ".join(words) for line in body.split("\n") if (words := line.split()))
     
-    def _group_requirement_blocks(self, lines: List[str]) -> List[List[str]]:
+    def _extract_page_texts(self, input_path: Path) -> List[str]:
         """
-        Group lines into requirement blocks.
+        Extract the raw text of every page, in page order.
         
-        Each block starts with "ID :" and ends with "Compliance Comment :".
+        Large documents are split into contiguous page ranges that worker
+        processes extract concurrently (MuPDF is not thread-safe), unless
+        parallel_pages is off.
         
         Args:
-            lines: All text lines from PDF
+            input_path: Path to PDF file
             
         Returns:
-            List of requirement blocks (each block is a list of lines)
+            List of page texts
         """
-        blocks = []
-        current_block = []
-        recording = False
+        with pymupdf.open(str(input_path)) as doc:
+            page_count = doc.page_count
+            workers = min(os.cpu_count() or 1, 8)
+            if not self.parallel_pages or page_count < self.PARALLEL_MIN_PAGES or workers < 2:
+                return [page.get_text("text") for page in doc]
         
-        for line in lines:
-            if line.startswith("ID :"):
-                # Start new requirement block
-                recording = True
-                current_block = [line]
-            elif recording:
-                current_block.append(line)
-                
-                # End of requirement block
-                if line.startswith("Compliance Comment :") or "ompliance Comment :" in line:
-                    blocks.append(current_block)
-                    recording = False
-                    current_block = []
-        
-        return blocks
+        step = -(-page_count // workers)  # ceil division
+        starts = range(0, page_count, step)
+        stops = [min(start + step, page_count) for start in starts]
+        with ProcessPoolExecutor(max_workers=len(starts)) as executor:
+            chunks = executor.map(_extract_page_texts, repeat(str(input_path)), starts, stops)
+            return [text for chunk in chunks for text in chunk]
     
-    def _parse_requirement_block(self, block: List[str]) -> Requirement:
+    def _parse_requirement_blocks(self, lines: Iterable[str]) -> Iterator[Requirement]:
         """
-        Parse a single requirement block into a Requirement object.
+        Parse requirement blocks while walking the lines once.
+        
+        Each block starts with "ID :" and ends with "Compliance Comment :";
+        its fields are collected as its lines go by, so no block's lines
+        are ever gathered into a list.
         
         Args:
-            block: Lines of text for one requirement
+            lines: All text lines from PDF (any iterable)
             
-        Returns:
-            Requirement object with extracted fields
+        Yields:
+            Requirement object for each completed block
         """
-        # Initialize all fields as a dictionary
-        fields = {
-            "requirement_id": "",
-            "type": "",
-            "definition": "",
-            "source": "",
-            "verification": "",
-            "compliance": "",
-            "allocation": "",
-            "comments": "",
-            "compliance_comment": ""
-        }
-        
-        # Track multi-line field continuation
+        # Fields of the open block (None while outside a block)
+        fields = None
+        # Track multi-line field continuation; continued fields collect their
+        # pieces in a list and are joined once the block ends
         current_multiline_field = None
+        parts = None
+        
+        # Bind the per-line lookups once instead of resolving them on self
+        marker = self._KEYWORD_MARKER
+        findall = self._KEYWORD_RE.findall
+        targets = self._KEYWORD_TARGETS
         
-        for line in block:
-            line_has_keyword = False
+        for line in lines:
+            if line.startswith("ID :"):
+                # Start new requirement block (an unfinished one is dropped)
+                fields = dict.fromkeys(self._BLOCK_FIELDS, "")
+                parts = {"definition": [""], "comments": [""]}
+                current_multiline_field = None
+                block_end = False
+            elif fields is None:
+                continue
+            else:
+                # End of requirement block (also matches a truncated
+                # "Compliance Comment :", which covers the untruncated form)
+                block_end = "ompliance Comment :" in line
             
-            # Check each keyword
-            for keyword, field in self.KEYWORDS.items():
-                if keyword in line:
-                    value = line.replace(keyword, '').strip()
-                    fields[field] = value
-                    
-                    # Set multi-line continuation flags
-                    if field == "type":
-                        current_multiline_field = "definition"
-                    elif field == "comments":
-                        current_multiline_field = "comments"
+            found = marker in line and findall(line)
+            
+            if found:
+                # Lines almost always hold a single keyword, and then it
+                # occurs exactly once: a leading one is sliced off instead of
+                # scanning the line again with replace()
+                if len(found) == 1:
+                    keyword = found[0]
+                    if line.startswith(keyword):
+                        value = line[len(keyword):].strip()
                     else:
-                        current_multiline_field = None
-                    
-                    line_has_keyword = True
-                    break
+                        value = line.replace(keyword, '').strip()
+                else:
+                    keyword = min(found, key=self._KEYWORD_RANK.__getitem__)
+                    value = line.replace(keyword, '').strip()
+                
+                # One lookup gives the field and its multi-line continuation
+                field, current_multiline_field = targets[keyword]
+                fields[field] = value
+                if field in parts:
+                    parts[field] = [value]
             
             # Handle multi-line continuation
-            if not line_has_keyword and current_multiline_field:
-                fields[current_multiline_field] += " " + line
+            elif current_multiline_field:
+                parts[current_multiline_field].append(line)
+            
+            if block_end:
+                yield self._build_requirement(fields, parts)
+                fields = None
+    
+    @staticmethod
+    def _build_requirement(fields: Dict[str, str], parts: Dict[str, List[str]]) -> Requirement:
+        """
+        Build a Requirement from the fields collected for one block.
+        
+        Args:
+            fields: Single-line field values, keyed by PDF field name
+            parts: Pieces of the multi-line fields
+            
+        Returns:
+            Requirement object with extracted fields
+        """
+        for field, pieces in parts.items():
+            fields[field] = " ".join(pieces)
         
         # Create Requirement (map PDF fields to DOORS schema)
         req = Requirement(
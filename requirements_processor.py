@@ -15,25 +15,38 @@ Author: Christopher Granabetter Ifa - UVIE
 Date: November 2025
 """
 
+import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import List, Optional, Sequence, Tuple
 
 import pandas as pd
 
-from utils import FileCache, detect_file_type, get_output_path, generate_template
+from utils import (
+    FileCache,
+    InteractiveInputRequired,
+    detect_file_type,
+    get_cache,
+    get_output_path,
+    generate_template,
+    set_prompts_enabled,
+)
 from processors import ExcelProcessor, PDFProcessor
+from utils.io_helpers import list_directory
 from utils.tracer.config import load_config, slugify_label
 
 
-def get_processor(file_path: Path, cache: FileCache):
+def get_processor(file_path: Path, cache: FileCache, parallel_pages: bool = True):
     """
     Factory function: return appropriate processor for file type.
     
     Args:
         file_path: Path to file
         cache: FileCache instance
+        parallel_pages: Let the PDF processor start its own worker processes
         
     Returns:
         ExcelProcessor or PDFProcessor
@@ -46,7 +59,7 @@ def get_processor(file_path: Path, cache: FileCache):
     if file_type in ['excel', 'csv']:
         return ExcelProcessor(cache)
     elif file_type == 'pdf':
-        return PDFProcessor(cache)
+        return PDFProcessor(cache, parallel_pages=parallel_pages)
     else:
         raise ValueError(f"Unsupported file type: {file_path.suffix}")
 
@@ -57,6 +70,7 @@ def process_single_file(
     cache: Optional[FileCache] = None,
     sheet_name: Optional[str] = None,
     id_template: Optional[str] = None,
+    parallel_pages: bool = True,
 ):
     """
     Process a single requirements file.
@@ -64,10 +78,11 @@ def process_single_file(
     Args:
         input_path: Path to input file
         output_path: Optional output path (auto-generated if None)
-        cache: FileCache instance (created if None)
+        cache: FileCache instance (shared instance if None)
+        parallel_pages: Let the PDF processor start its own worker processes
     """
     if cache is None:
-        cache = FileCache()
+        cache = get_cache()
     
     print(f"\n{'-'*60}")
     print(f"Processing: {input_path.name}")
@@ -79,6 +94,7 @@ def process_single_file(
         cache=cache,
         sheet_name=sheet_name,
         id_template=id_template,
+        parallel_pages=parallel_pages,
     )
     if normalized is None:
         return False
@@ -101,13 +117,14 @@ def normalize_input_file(
     cache: Optional[FileCache] = None,
     sheet_name: Optional[str] = None,
     id_template: Optional[str] = None,
+    parallel_pages: bool = True,
 ) -> Optional[Tuple[List[object], pd.DataFrame, object]]:
     """Return normalized requirements and dataframe for a single input file."""
     if cache is None:
-        cache = FileCache()
+        cache = get_cache()
 
     try:
-        processor = get_processor(input_path, cache)
+        processor = get_processor(input_path, cache, parallel_pages=parallel_pages)
     except ValueError as e:
         print(f"Error: {e}")
         return None
@@ -137,21 +154,59 @@ def _extract_requirements(
     return processor.extract_requirements(input_path)
 
 
+def _process_batch_file(file_path: Path, cache_dir: Path) -> Tuple[Optional[bool], dict]:
+    """
+    Process one file in a worker process of a parallel batch run.
+    
+    The worker's cache is not written to disk; its choices for the file are
+    returned so that the parent process alone updates the cache file.
+    Workers cannot prompt: a file that needs a sheet or column choice is
+    handed back to the parent, and large PDFs are extracted in the worker
+    itself rather than in a nested process pool.
+    
+    Args:
+        file_path: File to process
+        cache_dir: Directory of the parent's cache
+        
+    Returns:
+        Tuple of (success, or None if the file needs interactive input,
+        cached choices for file_path)
+    """
+    set_prompts_enabled(False)
+    cache = FileCache(cache_dir, persist=False)
+    try:
+        success = process_single_file(file_path, cache=cache, parallel_pages=False)
+    except InteractiveInputRequired:
+        return None, {}
+    except Exception as e:
+        print(f"Error processing {file_path.name}: {e}")
+        success = False
+    return success, cache.get_choices(file_path)
+
+
 def process_batch(
     directory: Path,
     file_type_filter: str = 'all',
-    cache: Optional[FileCache] = None
+    cache: Optional[FileCache] = None,
+    jobs: int = 1,
 ):
     """
     Process all files in a directory.
     
+    With jobs > 1 (or 0 for one per CPU) files are processed in parallel
+    worker processes. Workers cannot prompt: files that need a sheet or
+    column choice not yet cached (and not answered by DEBUG_MODE) are
+    processed one by one, interactively, after the parallel run.
+    
     Args:
         directory: Directory containing requirements files
         file_type_filter: 'all', 'pdf', 'excel', or 'csv'
-        cache: FileCache instance (created if None)
+        cache: FileCache instance (shared instance if None)
+        jobs: Number of worker processes (1 = sequential, interactive;
+              0 = one per CPU)
     """
     if cache is None:
-        cache = FileCache()
+        cache = get_cache()
     
     print(f"\n{'-'*60}")
     print(f"BATCH PROCESSING: {directory}")
@@ -160,18 +215,21 @@ def process_batch(
     
     # Supported extensions
     extensions = {
-        'all': ['.pdf', '.xlsx', '.xls', '.xlsm', '.csv'],
-        'pdf': ['.pdf'],
-        'excel': ['.xlsx', '.xls', '.xlsm'],
-        'csv': ['.csv'],
+        'all': {'.pdf', '.xlsx', '.xls', '.xlsm', '.csv'},
+        'pdf': {'.pdf'},
+        'excel': {'.xlsx', '.xls', '.xlsm'},
+        'csv': {'.csv'},
     }
     
     allowed_exts = extensions.get(file_type_filter, extensions['all'])
     
-    # Find all matching files
+    # Find all matching files (list_directory skips subdirectories, hidden
+    # and temporary files such as Excel's ~$ lock files, with no stat per
+    # entry); a Path is only built for files that are kept
+    splitext = os.path.splitext
     files = [
-        f for f in directory.iterdir()
-        if f.is_file() and f.suffix.lower() in allowed_exts
+        Path(path) for path in list_directory(directory)
+        if splitext(path)[1].lower() in allowed_exts
     ]
     
     if not files:
@@ -182,7 +240,28 @@ def process_batch(
     
     # Process each file
     success_count = 0
-    for file_path in files:
+    if jobs < 0:
+        raise ValueError(f"jobs must be 0 (one per CPU) or more, got {jobs}")
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    serial_files = files
+    if jobs > 1 and len(files) > 1:
+        serial_files = []
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+            results = executor.map(_process_batch_file, files, repeat(cache.cache_dir))
+            # Merge the workers' choices with one cache write at the end
+            with cache.batched():
+                for file_path, (success, choices) in zip(files, results):
+                    if success is None:
+                        print(f"{file_path.name} needs an interactive choice; "
+                              f"processing it after the parallel run")
+                        serial_files.append(file_path)
+                        continue
+                    if choices and choices != cache.get_choices(file_path):
+                        cache.save_choices(file_path, **choices)
+                    success_count += success
+    
+    for file_path in serial_files:
         try:
             if process_single_file(file_path, cache=cache):
                 success_count += 1
@@ -200,7 +279,7 @@ def process_from_config(
 ) -> int:
     """Process all configured sources from a tracer-style .cfg file."""
     if cache is None:
-        cache = FileCache()
+        cache = get_cache()
 
     config = load_config(str(cfg_path))
 
@@ -241,6 +320,17 @@ def process_from_config(
     return 0 if success_count == len(entries) else 1
 
 
+def _job_count(value: str) -> int:
+    """argparse type for --jobs: a non-negative integer (0 = one per CPU)."""
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid job count: '{value}'")
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f"job count must be 0 or more, got {jobs}")
+    return jobs
+
+
 def main(argv: Optional[Sequence[str]] = None):
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -263,6 +353,9 @@ Examples:
   # Process only PDFs in a directory
   %(prog)s --batch requirement_documents/ --type pdf
   
+  # Process a directory with 4 worker processes
+  %(prog)s --batch requirement_documents/ -j 4
+  
   # Generate a template file
   %(prog)s --template templates/requirements_template.xlsx
   
@@ -307,6 +400,15 @@ Examples:
         help='Type of files to process in batch mode (default: all)'
     )
     
+    # Parallel batch processing
+    parser.add_argument(
+        '-j', '--jobs',
+        type=_job_count,
+        default=1,
+        help='Number of worker processes for --batch: 1 processes files one '
+             'by one (default), 0 uses one worker per CPU'
+    )
+    
     # Template generation
     parser.add_argument(
         '--template',
@@ -331,7 +433,7 @@ Examples:
     args = parser.parse_args(argv)
     
     # Initialize cache
-    cache = FileCache()
+    cache = get_cache()
     
     # Handle cache clearing
     if args.clear_cache:
@@ -368,7 +470,7 @@ Examples:
             print(f"Error: {args.batch} is not a directory")
             return 1
         
-        process_batch(args.batch, args.type, cache)
+        process_batch(args.batch, args.type, cache, jobs=args.jobs)
         return 0
     
     # Handle single file processing
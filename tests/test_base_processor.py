@@ -0,0 +1,17 @@
+"""Tests for the shared requirement model in utils.base_processor."""
+
+from dataclasses import fields
+
+from utils.base_processor import REQUIREMENT_FIELD_COLUMNS, Requirement
+from utils.constants import COLUMNS
+
+
+def test_requirement_field_columns_cover_the_schema():
+    assert sorted(REQUIREMENT_FIELD_COLUMNS) == sorted(COLUMNS)
+    assert len(REQUIREMENT_FIELD_COLUMNS) == len(fields(Requirement))
+
+
+def test_positional_construction_follows_requirement_field_columns():
+    requirement = Requirement(*REQUIREMENT_FIELD_COLUMNS)
+
+    assert requirement.to_dict() == {column: column for column in COLUMNS}
@@ -0,0 +1,78 @@
+"""Tests for utils.cache.FileCache persistence."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cache import _LOADED_CACHES, FileCache
+from utils.io_helpers import get_parquet_engine
+
+
+def _legacy_key(path):
+    """Key the pre-series FileCache gave a file (MD5 of path, mtime, size)."""
+    stat = os.stat(path)
+    unique_string = f"{Path(path).resolve()}_{stat.st_mtime}_{stat.st_size}"
+    return hashlib.md5(unique_string.encode()).hexdigest()
+
+
+def test_loads_pre_series_cache_file(tmp_path, capsys):
+    source = tmp_path / "requirements.xlsx"
+    source.write_bytes(b"workbook contents")
+    choices = {"sheet_name": "Reqs", "column_mappings": {"req text": "Definition"}}
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "file_processing_cache.json").write_text(
+        json.dumps({_legacy_key(source): choices, "0" * 32: {"sheet_name": "Gone"}}, indent=2)
+    )
+
+    cache = FileCache(cache_dir)
+    assert cache.get_choices(str(source)) == choices
+    assert "previous cache format" in capsys.readouterr().out
+
+    # The snapshot was rewritten once, so a new process gets no second note,
+    # and the migrated entry is now validated by content hash
+    os.utime(source, ns=(0, 10**18))
+    _LOADED_CACHES.clear()
+    reloaded = FileCache(cache_dir)
+    assert reloaded.get_choices(str(source)) == choices
+    assert "previous cache format" not in capsys.readouterr().out
+
+
+def test_legacy_choices_do_not_apply_to_changed_file(tmp_path):
+    source = tmp_path / "requirements.csv"
+    source.write_text("a;b\n")
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "file_processing_cache.json").write_text(
+        json.dumps({_legacy_key(source): {"sheet_name": "Old"}})
+    )
+
+    source.write_text("a;b;c\n")
+
+    assert FileCache(cache_dir).get_choices(str(source)) == {}
+
+
+@pytest.mark.skipif(get_parquet_engine() is None, reason="no Parquet engine installed")
+def test_cached_sheets_follow_their_entry(tmp_path):
+    source = tmp_path / "requirements.xlsx"
+    source.write_bytes(b"first version")
+    cache = FileCache(tmp_path / "cache")
+    sheet = pd.DataFrame({2024: ["R1", np.nan], "Type": ["x", "y"]}, dtype=object)
+
+    cache.save_sheet(str(source), "Reqs", sheet, sheet_names=["Reqs", "Other"])
+    assert cache.get_sheet_names(str(source)) == ["Reqs", "Other"]
+    assert cache.load_sheet(str(source), "Reqs").equals(sheet.set_axis(["2024", "Type"], axis=1))
+
+    # A changed file replaces the entry and deletes the sheets it cached
+    source.write_bytes(b"second version, longer")
+    assert cache.load_sheet(str(source), "Reqs") is None
+    cache.save_sheet(str(source), "Other", sheet)
+    assert len(list(cache.sheet_dir.iterdir())) == 1
+
+    cache.clear(str(source))
+    assert list(cache.sheet_dir.iterdir()) == []
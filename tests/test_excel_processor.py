@@ -0,0 +1,30 @@
+"""Tests for spreadsheet loading in processors.excel_processor."""
+
+import pytest
+
+from processors.excel_processor import ExcelProcessor
+from utils.text_processing import clean_cell_value, clean_series
+
+
+@pytest.fixture
+def short_row_csv(tmp_path):
+    path = tmp_path / "requirements.csv"
+    path.write_text("ID;Title;Definition\nR1;T1;D1\nR2;T2\nR3;T3;D3\n", encoding="utf-8")
+    return path
+
+
+def test_load_csv_keeps_rows_with_trailing_fields_cut_off(short_row_csv):
+    df = ExcelProcessor()._load_csv(short_row_csv)
+
+    assert df["ID"].tolist() == ["R1", "R2", "R3"]
+    assert df["Definition"].isna().tolist() == [False, True, False]
+
+
+def test_load_csv_reads_values_verbatim(tmp_path):
+    path = tmp_path / "requirements.csv"
+    path.write_text('ID;Title;Definition\n"007";1.50;" é "\n', encoding="utf-8")
+
+    df = ExcelProcessor()._load_csv(path)
+
+    assert df.iloc[0].tolist() == ["007", "1.50", " é "]
+    assert clean_series(df["Definition"]).tolist() == [clean_cell_value(" é ")]
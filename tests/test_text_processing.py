@@ -0,0 +1,48 @@
+"""Tests for the vectorized cell cleaning in utils.text_processing."""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.text_processing import clean_cell_value, clean_series
+
+MIXED_CELLS = [
+    " plain ascii ",
+    None,
+    np.nan,
+    pd.NA,
+    "",
+    "line\r\nbreak_x000D_",
+    " café ≤ 5° ",
+    "“quoted” – dash",
+    "café ≤ 5°",
+    1,
+    2.5,
+    1.0,
+    True,
+    datetime.datetime(2024, 1, 2, 3, 4),
+]
+
+
+@pytest.mark.parametrize(
+    "series",
+    [
+        pd.Series(MIXED_CELLS, dtype=object),
+        pd.Series([" a ", None, " é ", "b\r"], dtype="string"),
+        pd.Series([1.5, np.nan, 3.0]),
+        pd.Series([" x ", "é", " x "], dtype="category"),
+    ],
+    ids=["object", "string", "float", "category"],
+)
+def test_clean_series_matches_clean_cell_value(series):
+    expected = series.astype(object).map(clean_cell_value).tolist()
+
+    assert clean_series(series).tolist() == expected
+
+
+def test_clean_series_keeps_index():
+    series = pd.Series([" a ", None], index=[10, 20], dtype=object)
+
+    assert clean_series(series).index.tolist() == [10, 20]
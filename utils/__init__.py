@@ -6,6 +6,7 @@ Shared constants, text processing, caching, and I/O helpers.
 from .constants import (
     COLUMNS,
     COLUMN_MAPPING,
+    COLUMN_MAPPING_KEYS,
     COMPLIANCE_MAP,
     PDF_KEYWORDS,
     DEBUG_MODE,
@@ -14,14 +15,20 @@ from .constants import (
 from .text_processing import (
     normalize_unicode_text,
     clean_cell_value,
+    clean_series,
     normalize_whitespace,
 )
-from .cache import FileCache
+from .cache import FileCache, get_cache
 from .io_helpers import (
     debug_input,
     detect_file_type,
+    get_excel_engine,
     get_output_path,
+    get_parquet_engine,
+    get_string_dtype,
+    InteractiveInputRequired,
     load_env,
+    set_prompts_enabled,
 )
 from .base_processor import (
     Requirement,
@@ -33,6 +40,7 @@ __all__ = [
     # Constants
     'COLUMNS',
     'COLUMN_MAPPING',
+    'COLUMN_MAPPING_KEYS',
     'COMPLIANCE_MAP',
     'PDF_KEYWORDS',
     'DEBUG_MODE',
@@ -40,14 +48,21 @@ __all__ = [
     # Text processing
     'normalize_unicode_text',
     'clean_cell_value',
+    'clean_series',
     'normalize_whitespace',
     # Cache
     'FileCache',
+    'get_cache',
     # I/O helpers
     'debug_input',
     'detect_file_type',
+    'get_excel_engine',
     'get_output_path',
+    'get_parquet_engine',
+    'get_string_dtype',
+    'InteractiveInputRequired',
     'load_env',
+    'set_prompts_enabled',
     # Base classes
     'Requirement',
     'BaseProcessor',
@@ -4,22 +4,27 @@ Defines common interface and shared logic for all processor types.
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from operator import attrgetter
 from pathlib import Path
 from typing import List
 import pandas as pd
 import csv
+import os
 
 from utils.constants import COLUMNS, COMPLIANCE_MAP
-from utils.text_processing import clean_cell_value, reformat_itemize_in_text
+from utils.io_helpers import get_string_dtype
+from utils.text_processing import clean_series, reformat_itemize_in_text
 
 
-@dataclass
+@dataclass(slots=True)
 class Requirement:
     """
     Unified requirement model matching DOORS 18-column schema.
     
-    All processors convert their inputs to this common format.
+    All processors convert their inputs to this common format. Instances
+    use __slots__ (no per-instance __dict__), as large documents hold
+    thousands of them.
     """
     requirement_id: str = ""
     parent_id: str = ""
@@ -64,6 +69,23 @@ class Requirement:
         }
 
 
+# Schema columns in Requirement field order, for positional construction.
+# Derived from to_dict() so reordering the dataclass fields cannot silently
+# shift values into the wrong attribute
+_FIELD_NAMES = [field.name for field in fields(Requirement)]
+_COLUMN_FOR_FIELD = {
+    field_name: column
+    for column, field_name in Requirement(**{name: name for name in _FIELD_NAMES}).to_dict().items()
+}
+REQUIREMENT_FIELD_COLUMNS = [_COLUMN_FOR_FIELD[name] for name in _FIELD_NAMES]
+
+# Canonical compliance codes (already normalized, map to themselves)
+_COMPLIANCE_CODES = frozenset(COMPLIANCE_MAP.values())
+
+# Reads all Requirement fields as one tuple, in REQUIREMENT_FIELD_COLUMNS order
+_requirement_values = attrgetter(*_FIELD_NAMES)
+
+
 class BaseProcessor(ABC):
     """
     Abstract base class for all requirement processors.
@@ -109,9 +131,14 @@ class BaseProcessor(ABC):
         if not requirements:
             return pd.DataFrame(columns=COLUMNS)
             
-        data = [req.to_dict() for req in requirements]
-        df = pd.DataFrame(data)
-                
+        # Build each column straight from the field values instead of one
+        # dict per requirement, as Arrow strings when pyarrow is available
+        columns = zip(*map(_requirement_values, requirements))
+        df = pd.DataFrame(
+            dict(zip(REQUIREMENT_FIELD_COLUMNS, map(list, columns))),
+            dtype=get_string_dtype(),
+        )
+        
         return df[COLUMNS]
     
     def normalize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -128,14 +155,20 @@ class BaseProcessor(ABC):
         Returns:
             Normalized DataFrame
         """
-        # Clean all text columns
+        # Clean all text columns (one vectorized pass per column)
         for col in df.columns:
             if col in COLUMNS:
-                df[col] = df[col].apply(clean_cell_value)
+                df[col] = clean_series(df[col])
         
-        # Normalize compliance values
+        # Normalize compliance values once per distinct value rather than
+        # per row (unknown values kept); the categorical is only a lookup
+        # aid, the column is returned as plain strings
         if 'Compliance' in df.columns:
-            df['Compliance'] = df['Compliance'].apply(self._normalize_compliance)
+            compliance = df['Compliance'].astype(str).astype('category')
+            df['Compliance'] = compliance.map({
+                value: self._normalize_compliance(value)
+                for value in compliance.cat.categories
+            }).astype(str)
 
         # Reformat LaTeX itemize blocks in free-text fields
         TEXT_COLUMNS = {'Definition', 'Notes', 'Remarks', 'Title', 'ComplianceNotes', 'VerificationNotes'}
@@ -143,12 +176,8 @@ class BaseProcessor(ABC):
             if col in df.columns:
                 df[col] = df[col].apply(reformat_itemize_in_text)
         
-        # Ensure column order
-        for col in COLUMNS:
-            if col not in df.columns:
-                df[col] = ""
-                
-        return df[COLUMNS]
+        # Ensure column order (missing columns filled with "" in one reindex)
+        return df.reindex(columns=COLUMNS, fill_value="")
     
     def _normalize_compliance(self, value):
         """
@@ -162,6 +191,10 @@ class BaseProcessor(ABC):
         """
         if not value or value == "":
             return ""
+        
+        # Values that are already codes need no case/whitespace folding
+        if value in _COMPLIANCE_CODES:
+            return value
             
         value_lower = str(value).strip().lower()
         return COMPLIANCE_MAP.get(value_lower, value)
@@ -171,6 +204,9 @@ class BaseProcessor(ABC):
         Export DataFrame to CSV with semicolon delimiter.
         
         Uses semicolon separator and backslash escaping per project standards.
+        Rows are written with csv.writer straight from the value array, which
+        produces the same output as DataFrame.to_csv without its per-chunk
+        formatting overhead.
         
         Args:
             df: DataFrame to export
@@ -179,13 +215,18 @@ class BaseProcessor(ABC):
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        df.to_csv(
-            output_path,
-            sep=';',
-            index=False,
-            quoting=csv.QUOTE_MINIMAL,
-            doublequote=True
-        )
+        # Missing values are written as empty fields, as to_csv does
+        values = df.astype(object).where(df.notna(), "").to_numpy().tolist()
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(
+                f,
+                delimiter=';',
+                quoting=csv.QUOTE_MINIMAL,
+                doublequote=True,
+                lineterminator=os.linesep,
+            )
+            writer.writerow(df.columns)
+            writer.writerows(values)
         print(f"Saved to {output_path}")
     
     def export_excel(self, df: pd.DataFrame, output_path: Path):
@@ -231,9 +272,7 @@ def generate_template(output_path: Path):
     Args:
         output_path: Path for template file (.csv or .xlsx)
     """
-    df = pd.DataFrame(columns=COLUMNS)
-    
-    # Add one sample row to show structure
+    # One sample row to show structure
     sample_row = {
         "ParentID": "REQ-001",
         "RequirementID": "REQ-001-01",
@@ -254,7 +293,7 @@ def generate_template(output_path: Path):
         "OriginalESAIdentifier": "ESA-REQ-001",
         "UpdatesMade": "",
     }
-    df = pd.concat([df, pd.DataFrame([sample_row])], ignore_index=True)
+    df = pd.DataFrame([sample_row], columns=COLUMNS)
     
     # Export directly without instantiating BaseProcessor
     output_path = Path(output_path)
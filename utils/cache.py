@@ -5,82 +5,418 @@ Stores user choices (sheet selections, column mappings) to avoid re-prompting.
 
 import os
 import json
+import shutil
 import hashlib
+import mmap
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from utils.constants import CACHE_DIR, CACHE_FILE
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fallback to the stdlib json module
+
+try:
+    from xxhash import xxh3_64 as _new_hasher
+except ImportError:
+    def _new_hasher(data=b""):
+        """64-bit hasher (BLAKE2b fallback for xxhash)."""
+        return hashlib.blake2b(data, digest_size=8)
+
+from utils.constants import CACHE_DIR, CACHE_FILE, CACHE_LOG
+from utils.io_helpers import get_parquet_engine
+
+# Parsed cache contents shared by every FileCache pointing at the same file,
+# with the on-disk state they were read from, so that a run only parses the
+# JSON again when another process has changed it
+_LOADED_CACHES = {}
+
+# FileCache per cache directory, as handed out by get_cache()
+_INSTANCES = {}
+
+# Read size for content hashing of files that cannot be memory-mapped
+_HASH_CHUNK = 1 << 20
+
+
+def _dumps(obj, indent=False):
+    """Serialize obj to JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        # Non-string keys (e.g. numeric headers) become strings, as with json
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def _key_digest(data):
+    """16-character hex digest of data."""
+    return _new_hasher(data).hexdigest()
+
+
+def _content_digest(path):
+    """
+    16-character hex digest of a file's contents.
+    
+    The file is memory-mapped and hashed in place, so no bytes objects are
+    allocated for its contents; it is read in 1 MiB chunks where it cannot
+    be mapped.
+    """
+    hasher = _new_hasher()
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+        except ValueError:
+            pass  # Empty file (cannot be mapped): digest of no bytes
+        except OSError:
+            while chunk := f.read(_HASH_CHUNK):
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _loads(data):
+    """Parse JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=1024)
+def _hash_file_key(path):
+    """
+    Cache key for a file (memoized per path).
+    
+    The key only identifies the file; whether its entry still applies is
+    decided by FileCache._lookup from the stored state and content hash.
+    
+    Args:
+        path: Absolute path of the file (symlinks not yet resolved)
+        
+    Returns:
+        16-character hex digest string
+    """
+    return _key_digest(str(Path(path).resolve()).encode())
+
+
+def get_cache(cache_dir=None):
+    """
+    Return the shared FileCache for a cache directory.
+    
+    Args:
+        cache_dir: Directory for cache file (default from constants)
+        
+    Returns:
+        FileCache instance, created on first use
+    """
+    key = Path(cache_dir or CACHE_DIR).resolve()
+    if key not in _INSTANCES:
+        _INSTANCES[key] = FileCache(cache_dir)
+    return _INSTANCES[key]
 
 
 class FileCache:
     """
     Manages persistent cache of user choices for file processing.
     
-    Uses file hash (path + mtime + size) as key to detect file changes.
-    Cache is stored as JSON in .cache/file_processing_cache.json
+    Choices are keyed by file path and stored with the file's mtime, size
+    and content hash. An unchanged mtime and size is trusted as is; when
+    only the mtime moved (checkouts, copies), the content hash decides
+    whether the choices still apply. Cache is stored as JSON in .cache/file_processing_cache.json; choices
+    saved since it was last written are appended, one JSON line each, to
+    .cache/file_processing_cache.log and folded back in when the log
+    outgrows the snapshot. Parsed spreadsheet sheets are kept as Parquet
+    files in .cache/sheets/, listed in their file's entry and deleted with it
     """
     
-    def __init__(self, cache_dir=None):
+    def __init__(self, cache_dir=None, persist=True, pretty=False):
         """
         Initialize cache manager.
         
         Args:
             cache_dir: Directory for cache file (default from constants)
+            persist: Write changes back to disk (False for worker processes,
+                     whose choices are merged by the parent)
+            pretty: Indent the JSON snapshot (for debugging; compact by
+                    default, which is smaller and faster to write and parse)
         """
         self.cache_dir = Path(cache_dir or CACHE_DIR)
         self.cache_file = self.cache_dir / CACHE_FILE
+        self.cache_log = self.cache_dir / CACHE_LOG
+        self.sheet_dir = self.cache_dir / "sheets"
+        self.persist = persist
+        self.pretty = pretty
         self._cache = None  # Lazy load
+        self._cache_key = self.cache_file.resolve()
+        self._batch_depth = 0  # Nesting level of batched() blocks
+        self._pending = {}  # Log records held back until flush()
         
-    def _get_file_hash(self, file_path):
+    def _lookup(self, file_path):
         """
-        Generate a hash of the file to uniquely identify it.
-
-        Normalises to an absolute path first so that the same file always
-        produces the same key regardless of whether it was supplied as a
-        relative or absolute path (e.g. manage vs pipeline / config-based
-        invocations resolve paths differently).
-
-        Uses absolute-path + modification time + size to detect changes.
-
+        Find the cache entry for a file and check it against the file.
+        
+        Entries are validated in two tiers: a matching (mtime, size) is a
+        hit without reading the file; a different mtime with the same size
+        falls back to comparing content hashes (a changed size is a miss).
+        
         Args:
-            file_path: Path to file (relative or absolute)
-
+            file_path: Path to file (relative or absolute), or an os.DirEntry
+            
         Returns:
-            MD5 hash string
+            Tuple of (entry key, current file state, entry or None); the
+            state is [mtime_ns, size], or None if the file does not exist
         """
-        abs_path = str(Path(file_path).resolve())
+        path = os.path.abspath(file_path)
+        file_key = _hash_file_key(path)
         try:
-            stat = os.stat(abs_path)
-            unique_string = f"{abs_path}_{stat.st_mtime}_{stat.st_size}"
-            return hashlib.md5(unique_string.encode()).hexdigest()
+            if isinstance(file_path, os.DirEntry):
+                stat = file_path.stat()
+            else:
+                stat = os.stat(path)
+            state = [stat.st_mtime_ns, stat.st_size]
         except FileNotFoundError:
-            # File doesn't exist yet (template generation, etc.)
-            return hashlib.md5(abs_path.encode()).hexdigest()
+            state = None
+        
+        entry = self._load_cache().get(file_key)
+        if entry is None and state is not None:
+            entry = self._migrate_legacy_entry(file_key, path, stat)
+        if entry is None or entry["state"] == state:
+            return file_key, state, entry
+        
+        if state is None or entry["state"] is None or entry["state"][1] != state[1]:
+            return file_key, state, None
+        try:
+            if _content_digest(path) != entry["content_hash"]:
+                return file_key, state, None
+        except OSError:
+            return file_key, state, None
+        
+        # Same contents under a new mtime: remember it, so the next lookup
+        # takes the fast path again
+        entry["state"] = state
+        self._append_log(file_key, entry)
+        return file_key, state, entry
+    
+    def _migrate_legacy_entry(self, file_key, path, stat):
+        """
+        Move a file's choices from the previous cache format to its new key.
+        
+        The previous format keyed bare choices by an MD5 of resolved path,
+        float mtime and size, so they still apply only while that key
+        matches the file; the migrated entry gets its state and content hash
+        now, as if the choices had just been saved.
+        
+        Args:
+            file_key: Current key of the file's entry
+            path: Absolute path of the file
+            stat: os.stat result for the file
+            
+        Returns:
+            Migrated entry, or None if the file has no legacy entry
+        """
+        cache = self._load_cache()
+        legacy_string = f"{Path(path).resolve()}_{stat.st_mtime}_{stat.st_size}"
+        legacy_key = hashlib.md5(legacy_string.encode()).hexdigest()
+        legacy = cache.get(legacy_key)
+        if legacy is None or not legacy.get("legacy"):
+            return None
+        
+        try:
+            content_hash = _content_digest(path)
+        except OSError:
+            content_hash = None
+        entry = {
+            "state": [stat.st_mtime_ns, stat.st_size],
+            "content_hash": content_hash,
+            "choices": legacy["choices"],
+        }
+        del cache[legacy_key]
+        cache[file_key] = entry
+        self._append_log(legacy_key, None)
+        self._append_log(file_key, entry)
+        return entry
     
     def _load_cache(self):
-        """Load the processing cache from disk."""
-        if self._cache is not None:
+        """
+        Load the processing cache from disk.
+        
+        The parsed cache is shared per process and reused for as long as
+        the snapshot and log are unchanged on disk (one stat each), so it is
+        only parsed again after another process wrote to it.
+        """
+        # Non-persisting and batching caches hold choices that were never
+        # written, so they keep what they loaded first
+        if self._cache is not None and (not self.persist or self._batch_depth):
             return self._cache
-            
+        
+        loaded = _LOADED_CACHES.get(self._cache_key)
+        if loaded is not None and (not self.persist or loaded[1] == self._disk_state()):
+            self._cache = loaded[0]
+            return self._cache
+        
+        legacy_count = 0
         if not self.cache_file.exists():
             self._cache = {}
-            return self._cache
-            
+        else:
+            try:
+                self._cache = _loads(self.cache_file.read_bytes())
+            except Exception as e:
+                print(f"Warning: Could not load cache: {e}")
+                self._cache = {}
+            # Entries from before content validation are bare choices under
+            # the old key; they are kept, marked as legacy, and moved to
+            # the new format by _lookup when their file is next used
+            for file_key, entry in self._cache.items():
+                if isinstance(entry, dict) and "state" not in entry:
+                    self._cache[file_key] = {
+                        "state": None,
+                        "content_hash": None,
+                        "choices": entry,
+                        "legacy": True,
+                    }
+                    legacy_count += 1
+            if legacy_count and self.persist:
+                print(
+                    f"Note: migrating {legacy_count} cached file choice(s) from "
+                    f"the previous cache format; they are kept for unchanged files"
+                )
+        
+        # Replay choices appended since the snapshot (last write wins), and
+        # fold them into a new snapshot once the log outgrows it (or holds a
+        # torn line that later appends would run into). A snapshot with
+        # legacy entries is rewritten at once, so the note above is shown once
+        log_size, damaged = self._replay_log()
+        if legacy_count or damaged or log_size > max(self._snapshot_size(), 1):
+            self._save_cache()
+        
+        self._remember_disk_state()
+        return self._cache
+    
+    def _disk_state(self):
+        """(mtime_ns, size) of the snapshot and the log (None if missing)."""
+        state = []
+        for path in (self.cache_file, self.cache_log):
+            try:
+                stat = os.stat(path)
+                state.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                state.append(None)
+        return tuple(state)
+    
+    def _remember_disk_state(self):
+        """Share the loaded cache together with the disk state it matches."""
+        _LOADED_CACHES[self._cache_key] = (self._cache, self._disk_state())
+    
+    def _replay_log(self):
+        """
+        Apply the append-only log to the loaded snapshot.
+        
+        Returns:
+            Tuple of (log size in bytes, whether a line was unreadable)
+        """
         try:
-            with open(self.cache_file, 'r') as f:
-                self._cache = json.load(f)
+            data = self.cache_log.read_bytes()
+        except FileNotFoundError:
+            return 0, False
         except Exception as e:
-            print(f"Warning: Could not load cache: {e}")
-            self._cache = {}
-            
-        return self._cache
+            print(f"Warning: Could not load cache log: {e}")
+            return 0, False
+        
+        damaged = False
+        for line in data.splitlines():
+            try:
+                record = _loads(line)
+                file_key, entry = record["key"], record["entry"]
+            except (ValueError, KeyError, TypeError):
+                # Torn write from an interrupted run; later lines still apply
+                damaged = True
+                continue
+            if entry is None:
+                self._cache.pop(file_key, None)
+            else:
+                self._cache[file_key] = entry
+        return len(data), damaged
+    
+    def _snapshot_size(self):
+        """Size of the JSON snapshot in bytes (0 if there is none)."""
+        try:
+            return self.cache_file.stat().st_size
+        except OSError:
+            return 0
     
     def _save_cache(self):
-        """Save the processing cache to disk."""
+        """Write the whole cache as a new snapshot and drop the log."""
+        if not self.persist:
+            return
+        # The snapshot holds every change, including those not yet logged
+        self._pending.clear()
+        # Written to a sibling file and renamed over the snapshot, so an
+        # interrupted write never leaves a truncated (unloadable) cache
+        tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
         try:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, 'w') as f:
-                json.dump(self._cache, f, indent=2)
+            tmp_file.write_bytes(_dumps(self._cache, indent=self.pretty))
+            os.replace(tmp_file, self.cache_file)
+            self.cache_log.unlink(missing_ok=True)
         except Exception as e:
             print(f"Warning: Could not save cache: {e}")
+            tmp_file.unlink(missing_ok=True)
+        else:
+            self._prune_sheets()
+        self._remember_disk_state()
+    
+    def _append_log(self, file_key, entry):
+        """
+        Record one file's cache entry (None for a removal) in the log.
+        
+        Costs one short write however many files are cached, where
+        _save_cache rewrites the whole snapshot; inside batched() the write
+        is deferred to flush().
+        """
+        if not self.persist:
+            return
+        self._pending[file_key] = {"key": file_key, "entry": entry, "ts": time.time()}
+        if not self._batch_depth:
+            self.flush()
+    
+    def flush(self):
+        """Append all log records held back by batched() in one write."""
+        if not self._pending:
+            return
+        # Entries are serialized now, so later in-place updates are included
+        data = b"".join(_dumps(record) + b"\n" for record in self._pending.values())
+        self._pending.clear()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_log, 'ab') as f:
+                f.write(data)
+        except Exception as e:
+            print(f"Warning: Could not save cache: {e}")
+        self._remember_disk_state()
+    
+    @contextmanager
+    def batched(self):
+        """
+        Defer cache writes until the block exits.
+        
+        Choices saved or cleared inside the block are visible right away
+        but reach the disk in a single append when the outermost block
+        exits (only the last record per file is written).
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
     
     def get_choices(self, file_path):
         """
@@ -92,9 +428,35 @@ class FileCache:
         Returns:
             Dictionary of cached choices (may be empty)
         """
+        entry = self._lookup(file_path)[2]
+        return entry["choices"] if entry is not None else {}
+    
+    def _valid_entry(self, file_path):
+        """
+        Return the file's cache entry, creating one if it is missing or stale.
+        
+        A stale entry is replaced together with the sheets it cached.
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            Tuple of (entry key, entry)
+        """
+        file_key, state, entry = self._lookup(file_path)
+        if entry is not None:
+            return file_key, entry
+        
         cache = self._load_cache()
-        file_hash = self._get_file_hash(file_path)
-        return cache.get(file_hash, {})
+        self._remove_sheets(cache.get(file_key))
+        # New or changed file: hash its contents once for later lookups
+        try:
+            content_hash = _content_digest(file_path) if state is not None else None
+        except OSError:
+            content_hash = None
+        entry = {"state": state, "content_hash": content_hash, "choices": {}}
+        cache[file_key] = entry
+        return file_key, entry
     
     def save_choices(self, file_path, **choices):
         """
@@ -105,23 +467,125 @@ class FileCache:
             **choices: Keyword arguments of choices to save
                       (e.g., sheet_name='Sheet1', column_mappings={...})
         """
-        cache = self._load_cache()
-        file_hash = self._get_file_hash(file_path)
+        file_key, entry = self._valid_entry(file_path)
         
         # Merge new choices with existing ones.
         # Dict values (e.g. column_mappings) are deep-merged so that entries
         # saved by one sheet are not overwritten when a different sheet from
         # the same file is processed and carries a different (possibly smaller)
         # set of columns.
-        existing = cache.get(file_hash, {})
+        # A valid entry is already in the cache and is updated in place
+        existing = entry["choices"]
         for key, value in choices.items():
-            if key in existing and isinstance(existing[key], dict) and isinstance(value, dict):
-                existing[key].update(value)
+            current = existing.get(key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                current.update(value)
             else:
                 existing[key] = value
-        cache[file_hash] = existing
         
-        self._save_cache()
+        self._append_log(file_key, entry)
+    
+    def _remove_sheets(self, entry):
+        """Delete the Parquet files of the sheets cached for an entry."""
+        if not entry:
+            return
+        for sheet_file in (entry.get("sheets") or {}).values():
+            if sheet_file:
+                (self.sheet_dir / sheet_file).unlink(missing_ok=True)
+    
+    def _prune_sheets(self):
+        """Delete Parquet files no cache entry refers to (e.g. left by killed runs)."""
+        referenced = {
+            sheet_file
+            for entry in self._cache.values()
+            for sheet_file in (entry.get("sheets") or {}).values()
+        }
+        try:
+            with os.scandir(self.sheet_dir) as entries:
+                for dir_entry in entries:
+                    if dir_entry.name not in referenced:
+                        os.unlink(dir_entry.path)
+        except OSError:
+            pass  # No sheet directory, or a file another run still holds
+    
+    def get_sheet_names(self, file_path):
+        """
+        Sheet names of a workbook recorded when one of its sheets was cached.
+        
+        Args:
+            file_path: Path to source file
+            
+        Returns:
+            List of sheet names, or None if unknown or the file changed
+        """
+        entry = self._lookup(file_path)[2]
+        return entry.get("sheet_names") if entry is not None else None
+    
+    def load_sheet(self, file_path, sheet_name):
+        """
+        Load a previously parsed sheet of an unchanged file.
+        
+        Args:
+            file_path: Path to source file
+            sheet_name: Name of the sheet
+            
+        Returns:
+            DataFrame as saved by save_sheet, or None on a cache miss
+        """
+        engine = get_parquet_engine()
+        entry = self._lookup(file_path)[2]
+        if engine is None or entry is None:
+            return None
+        sheet_file = (entry.get("sheets") or {}).get(sheet_name)
+        if not sheet_file:
+            return None
+        try:
+            df = pd.read_parquet(self.sheet_dir / sheet_file, engine=engine)
+        except Exception as e:
+            print(f"Warning: Could not load cached sheet: {e}")
+            return None
+        # Parquet nulls come back as None; restore the NaN read_excel produces
+        return df.astype(object).where(df.notna(), np.nan)
+    
+    def save_sheet(self, file_path, sheet_name, df, sheet_names=None):
+        """
+        Store a parsed sheet so later runs can skip re-reading the workbook.
+        
+        The Parquet file is recorded in the file's cache entry and deleted
+        when the entry is replaced or cleared. A sheet Parquet cannot store
+        is recorded too, so it is not attempted (and warned about) again.
+        
+        Args:
+            file_path: Path to source file
+            sheet_name: Name of the sheet
+            df: Parsed sheet (string columns)
+            sheet_names: Optional names of all sheets in the workbook
+        """
+        engine = get_parquet_engine()
+        if engine is None or not self.persist:
+            return
+        file_key, entry = self._valid_entry(file_path)
+        sheets = entry.setdefault("sheets", {})
+        if sheet_name in sheets and sheets[sheet_name] is None:
+            return
+        if sheet_names is not None:
+            entry["sheet_names"] = list(sheet_names)
+        
+        sheet_file = f"{_key_digest(f'{file_key}:{sheet_name}'.encode())}.parquet"
+        sheet_path = self.sheet_dir / sheet_file
+        try:
+            self.sheet_dir.mkdir(parents=True, exist_ok=True)
+            # Parquet needs string headers; they are standardized with
+            # astype(str) after loading either way
+            df.set_axis(df.columns.astype(str), axis=1).to_parquet(
+                sheet_path, engine=engine, index=False
+            )
+            sheets[sheet_name] = sheet_file
+        except Exception as e:
+            print(f"Warning: Could not cache sheet '{sheet_name}': {e}")
+            sheet_path.unlink(missing_ok=True)
+            sheets[sheet_name] = None
+        self._append_log(file_key, entry)
     
     def clear(self, file_path=None):
         """
@@ -134,21 +598,22 @@ class FileCache:
         cache = self._load_cache()
         
         if file_path:
-            file_hash = self._get_file_hash(file_path)
-            cache.pop(file_hash, None)
+            file_key = _hash_file_key(os.path.abspath(file_path))
+            self._remove_sheets(cache.pop(file_key, None))
+            self._append_log(file_key, None)
             print(f"Cleared cache for {file_path}")
         else:
             cache.clear()
+            shutil.rmtree(self.sheet_dir, ignore_errors=True)
+            self._save_cache()
             print("Cleared entire cache")
-            
-        self._save_cache()
     
     def list_cached_files(self):
         """
         List all files in cache (for debugging).
         
         Returns:
-            List of file hashes in cache
+            List of file keys (path hashes) in cache
         """
         cache = self._load_cache()
         return list(cache.keys())
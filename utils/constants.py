@@ -87,6 +87,9 @@ COLUMN_MAPPING = {
     "updatesmade": "UpdatesMade",
 }
 
+# Source header names with an automatic mapping (for fast membership tests)
+COLUMN_MAPPING_KEYS = frozenset(COLUMN_MAPPING)
+
 # Compliance normalization mapping
 COMPLIANCE_MAP = {
     "compliant": "C",
@@ -131,3 +134,4 @@ DEBUG_RESPONSES = {
 # Cache configuration
 CACHE_DIR = ".cache"
 CACHE_FILE = "file_processing_cache.json"
+CACHE_LOG = "file_processing_cache.log"
@@ -3,9 +3,19 @@ I/O helper utilities for interactive prompts and file operations.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 from utils.constants import DEBUG_MODE, DEBUG_RESPONSES
 
+# Whether debug_input may prompt; switched off in batch worker processes,
+# which have no usable stdin
+_prompts_enabled = True
+
+
+class InteractiveInputRequired(Exception):
+    """Raised by debug_input when a choice is needed but prompts are disabled."""
+
 
 def load_env(env_path: str = ".env") -> None:
     """
@@ -30,6 +40,18 @@ def load_env(env_path: str = ".env") -> None:
                 os.environ.setdefault(key.strip(), value.strip())
 
 
+def set_prompts_enabled(enabled: bool) -> None:
+    """
+    Allow or forbid interactive prompts in this process.
+    
+    Args:
+        enabled: False to make debug_input raise InteractiveInputRequired
+                 instead of reading stdin (DEBUG_MODE responses still apply)
+    """
+    global _prompts_enabled
+    _prompts_enabled = enabled
+
+
 def debug_input(prompt, debug_key=None):
     """
     Testable input function that supports debug mode.
@@ -44,6 +66,10 @@ def debug_input(prompt, debug_key=None):
     Returns:
         User input string or debug response
         
+    Raises:
+        InteractiveInputRequired: If prompts are disabled and there is no
+                                  debug response
+        
     Example:
         >>> DEBUG_MODE = True
         >>> DEBUG_RESPONSES = {"test": "auto_response"}
@@ -54,6 +80,8 @@ def debug_input(prompt, debug_key=None):
         response = DEBUG_RESPONSES[debug_key]
         print(f"{prompt}{response}  [DEBUG MODE]")
         return response
+    elif not _prompts_enabled:
+        raise InteractiveInputRequired(prompt.strip())
     else:
         try:
             return input(prompt)
@@ -66,7 +94,8 @@ def list_directory(path):
     """
     List all relevant files in the given directory.
     
-    Filters out placeholders, markdown files, and temporary files.
+    Filters out subdirectories, placeholders, markdown files, and temporary
+    files.
     
     Args:
         path: Directory path to list
@@ -75,20 +104,32 @@ def list_directory(path):
         List of file paths, or empty list if error
     """
     try:
-        files = os.listdir(path)
-        return [
-            os.path.join(path, file) 
-            for file in files 
-            if file != ".placeholder" 
-            and not file.endswith(".md") 
-            and not file.startswith('~')
-            and not file.startswith('.')
-        ]
+        with os.scandir(path) as entries:
+            # ".placeholder" is covered by the hidden-file prefix test;
+            # is_file() answers from the directory entry without a stat
+            return [
+                entry.path
+                for entry in entries
+                if not entry.name.startswith(('~', '.'))
+                and not entry.name.endswith(".md")
+                and entry.is_file()
+            ]
     except Exception as e:
         print(f"Error accessing directory '{path}': {e}")
         return []
 
 
+# File extension (lowercase) -> requirements file type
+_FILE_TYPES = {
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+    '.xlsm': 'excel',
+    '.csv': 'csv',
+    '.csv_semicolon': 'csv',
+    '.pdf': 'pdf',
+}
+
+
 def detect_file_type(file_path):
     """
     Detect the type of requirements file based on extension.
@@ -99,17 +140,61 @@ def detect_file_type(file_path):
     Returns:
         String: 'excel', 'csv', 'pdf', or 'unknown'
     """
-    path = Path(file_path)
-    ext = path.suffix.lower()
+    # One dict lookup on the extension, without building a Path
+    ext = os.path.splitext(file_path)[1].lower()
+    return _FILE_TYPES.get(ext, 'unknown')
+
+
+@lru_cache(maxsize=None)
+def get_excel_engine() -> Optional[str]:
+    """
+    Return the fastest available pandas engine for reading Excel files.
     
-    if ext in ['.xlsx', '.xls', '.xlsm']:
-        return 'excel'
-    elif ext == '.csv' or ext.lower() == '.csv_semicolon':
-        return 'csv'
-    elif ext == '.pdf':
-        return 'pdf'
-    else:
-        return 'unknown'
+    Prefers the Rust-backed ``calamine`` reader (python-calamine), which
+    parses workbooks several times faster and with far less memory than
+    openpyxl. Falls back to pandas' default engine selection if missing.
+    
+    Returns:
+        'calamine', or None to let pandas choose (openpyxl/xlrd)
+    """
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+    return 'calamine'
+
+
+@lru_cache(maxsize=None)
+def get_parquet_engine() -> Optional[str]:
+    """
+    Return the engine used for the parsed-sheet cache, if one is installed.
+    
+    Returns:
+        'pyarrow', or None when Parquet files cannot be written
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return 'pyarrow'
+
+
+@lru_cache(maxsize=None)
+def get_string_dtype() -> object:
+    """
+    Return the dtype used for text columns built from parsed requirements.
+    
+    Arrow-backed strings keep each column as one contiguous UTF-8 buffer
+    instead of a Python object per cell.
+    
+    Returns:
+        'string[pyarrow]', or object when pyarrow is not installed
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return object
+    return 'string[pyarrow]'
 
 
 def ensure_directory_exists(directory_path):
@@ -6,6 +6,34 @@ Handles Unicode normalization, cell cleaning, and text formatting.
 import unicodedata
 import re
 
+import numpy as np
+import pandas as pd
+
+from utils.io_helpers import get_string_dtype
+
+# \begin{itemize} / \end{itemize} markers, matched per free-text cell
+_ITEMIZE_RE = re.compile(r'\\(begin|end){itemize}')
+
+# Math symbols and typography that NFKD cannot turn into ASCII, as
+# (character, replacement) pairs so each call just walks a tuple
+_UNICODE_REPLACEMENTS = (
+    ('\u2264', '<='),  # ≤ less than or equal
+    ('\u2265', '>='),  # ≥ greater than or equal
+    ('\u2260', '!='),  # ≠ not equal
+    ('\u00b1', '+-'),  # ± plus-minus
+    ('\u00d7', 'x'),   # × multiplication
+    ('\u00f7', '/'),   # ÷ division
+    ('\u2212', '-'),   # − minus sign (different from hyphen)
+    ('\u2013', '-'),   # – en dash
+    ('\u2014', '--'),  # — em dash
+    ('\u2018', "'"),   # ' left single quote
+    ('\u2019', "'"),   # ' right single quote
+    ('\u201c', '"'),   # " left double quote
+    ('\u201d', '"'),   # " right double quote
+    ('\u2022', '*'),   # • bullet point
+    ('\u00a0', ' '),   # non-breaking space
+)
+
 
 def normalize_unicode_text(text):
     """
@@ -22,28 +50,16 @@ def normalize_unicode_text(text):
     """
     if not isinstance(text, str):
         return str(text)
+    
+    # Nothing to replace or decompose in pure-ASCII text (the common case)
+    if text.isascii():
+        return text
 
     # Manual replacements for math symbols and typography — must run BEFORE
     # the ASCII encode step so these characters are not silently stripped.
-    replacements = {
-        '\u2264': '<=',  # ≤ less than or equal
-        '\u2265': '>=',  # ≥ greater than or equal
-        '\u2260': '!=',  # ≠ not equal
-        '\u00b1': '+-',  # ± plus-minus
-        '\u00d7': 'x',   # × multiplication
-        '\u00f7': '/',   # ÷ division
-        '\u2212': '-',   # − minus sign (different from hyphen)
-        '\u2013': '-',   # – en dash
-        '\u2014': '--',  # — em dash
-        '\u2018': "'",   # ' left single quote
-        '\u2019': "'",   # ' right single quote
-        '\u201c': '"',   # " left double quote
-        '\u201d': '"',   # " right double quote
-        '\u2022': '*',   # • bullet point
-        '\u00a0': ' ',   # non-breaking space
-    }
-    
-    for unicode_char, ascii_replacement in replacements.items():
+    # (A handful of C-level replace() scans beats one str.translate pass,
+    # which maps non-ASCII text character by character.)
+    for unicode_char, ascii_replacement in _UNICODE_REPLACEMENTS:
         text = text.replace(unicode_char, ascii_replacement)
 
     # NFKD normalization converts compatibility characters to simpler forms,
@@ -67,21 +83,80 @@ def clean_cell_value(value):
     Returns:
         Cleaned string value
     """
-    if value is None or (isinstance(value, float) and value != value):  # NaN check
+    # NaN / NA check (pd.NA comes from Arrow- and nullable-backed columns)
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
         return ""
     
     # Convert to string and strip whitespace
     text = str(value).strip()
     
-    # Normalize Unicode characters
-    text = normalize_unicode_text(text)
-
-    # Replace _x000D_ with actual line breaks
-    text = text.replace('_x000D_', '')
+    # Normalize Unicode characters (pure-ASCII cells, the common case, need
+    # no normalization; carriage returns below must still be dropped)
+    if not text.isascii():
+        text = normalize_unicode_text(text)
+
+    # Drop carriage returns, whether left as Excel's literal _x000D_ escape
+    # (openpyxl) or already decoded to '\r' (calamine)
+    text = text.replace('_x000D_', '').replace('\r', '')
     
     return text
 
 
+def clean_series(series: pd.Series) -> pd.Series:
+    """
+    Vectorized clean_cell_value for a whole column.
+    
+    Converts the column to strings once, then strips and drops carriage
+    returns with column-wide string operations; Unicode normalization only
+    runs once per distinct non-ASCII value. Results match clean_cell_value.
+    
+    Args:
+        series: Column from DataFrame
+        
+    Returns:
+        Series of cleaned strings (missing values as "")
+    """
+    # One conversion to Arrow-backed strings, so the string operations below
+    # run as Arrow kernels (the plain "string" dtype without pyarrow)
+    dtype = get_string_dtype()
+    text = series.astype("string" if dtype is object else dtype).fillna("")
+    
+    # Unicode normalization is the identity on pure-ASCII cells, so only the
+    # (usually few) others go through it, once per distinct value. The test
+    # runs before stripping: stripping never makes an ASCII cell non-ASCII
+    non_ascii = _non_ascii_mask(text)
+    
+    text = text.str.strip()
+    if non_ascii.any():
+        values = text[non_ascii]
+        text[non_ascii] = values.map({value: normalize_unicode_text(value) for value in values.unique()})
+    return text.str.replace('_x000D_', '', regex=False).str.replace('\r', '', regex=False)
+
+
+def _non_ascii_mask(text: pd.Series) -> np.ndarray:
+    """
+    Flag the cells of a string column that contain non-ASCII characters.
+    
+    Uses Series.str.isascii (pandas 3) or the equivalent Arrow kernel
+    (pandas 2), and a per-cell test only for columns without pyarrow.
+    
+    Args:
+        text: Column with a string dtype and no missing values
+        
+    Returns:
+        Boolean array, True for non-ASCII cells
+    """
+    if hasattr(text.str, "isascii"):
+        ascii_mask = text.str.isascii()
+    elif getattr(text.dtype, "storage", None) == "pyarrow":
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        ascii_mask = pc.string_is_ascii(pa.array(text.array)).to_numpy(zero_copy_only=False)
+    else:
+        ascii_mask = text.map(str.isascii)
+    return ~np.asarray(ascii_mask, dtype=bool)
+
+
 def normalize_whitespace(text):
     """
     Normalize whitespace in text (collapse multiple spaces, trim).
@@ -92,7 +167,9 @@ def normalize_whitespace(text):
     Returns:
         Text with normalized whitespace
     """
-    return re.sub(r'\s+', ' ', text.strip())
+    # split() drops leading/trailing whitespace and splits on the same
+    # characters as \s, so join() collapses the runs without a regex
+    return ' '.join(text.split())
 
 
 def truncate_keyword(text, keyword_map):
@@ -116,6 +193,9 @@ def truncate_keyword(text, keyword_map):
 
 def reformat_itemize_in_text(text: str) -> str:
     """Find and reformat all \\begin{itemize}...\\end{itemize} blocks in a text string."""
+    # Most cells hold no list at all; a substring test settles them
+    if '\\begin{itemize}' not in text:
+        return text
     blocks = _extract_itemize_blocks(text)
     for block in blocks:
         text = text.replace(block, _reformat_itemize_block(block) + "\n")
@@ -127,7 +207,7 @@ def _extract_itemize_blocks(text: str) -> list[str]:
     depth = 0
     start = -1
 
-    for m in re.finditer(r'\\(begin|end){itemize}', text):
+    for m in _ITEMIZE_RE.finditer(text):
         if m.group(1) == 'begin':
             if depth == 0:
                 start = m.start()
@@ -160,6 +240,5 @@ def _reformat_itemize_block(block: str) -> str:
             new_line = "  " * depth + line.strip()
         
         new_lines.append(new_line)
-            
-        block = "\n".join(new_lines)
-    return block
+    
+    return "\n".join(new_lines)
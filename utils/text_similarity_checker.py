@@ -24,7 +24,6 @@ Date: November 2025
 
 # Standard library imports
 import csv
-import re
 import argparse
 import sys
 import numpy as np
@@ -52,7 +51,7 @@ def clean_text(text: Optional[str]) -> str:
         return ""
     
     # Remove extra whitespace and normalize case
-    cleaned = re.sub(r'\s+', ' ', text.strip().lower()).replace('"', '')
+    cleaned = ' '.join(text.lower().split()).replace('"', '')
     return cleaned
 
 
@@ -313,7 +312,8 @@ def semantic_similarity(text1: str, text2: str) -> float:
 def analyze_text_similarity(req_data: List[Dict[str, str]], 
                           toplevel_data: List[Dict[str, str]],
                           high_threshold: float = 0.7,
-                          medium_threshold: float = 0.4) -> List[Dict[str, any]]:
+                          medium_threshold: float = 0.4,
+                          semantic: bool = False) -> List[Dict[str, any]]:
     """
     Analyze text similarity between requirements and top-level data.
     
@@ -325,6 +325,8 @@ def analyze_text_similarity(req_data: List[Dict[str, str]],
         toplevel_data: List of top-level requirement items
         high_threshold: Minimum similarity for "high" classification (default: 0.7)
         medium_threshold: Minimum similarity for reporting (default: 0.4)
+        semantic: Also run and print the BERT similarity models for every
+                  pair (slow; needs semantic_text_similarity) (default: False)
         
     Returns:
         List of similarity match dictionaries, sorted by similarity (highest first)
@@ -360,7 +362,8 @@ def analyze_text_similarity(req_data: List[Dict[str, str]],
                 #     continue
                 #print(f"{similarity:.3f};{refined_similarity(req_item['text'], toplevel_item['text'])}")
 
-                semantic_similarity(req_item['text'], toplevel_item['text'])
+                if semantic:
+                    semantic_similarity(req_item['text'], toplevel_item['text'])
 
                 ai_similarity = 0
                 debug_file.write(f"{req_item['id']};{toplevel_item['id']};{similarity:.3f};{';'.join(map(str, refined_similarity_result))};{req_item['text'].replace(';', ',')};{toplevel_item['text'].replace(';', ',')};{ai_similarity:.3f}\n")
@@ -514,6 +517,12 @@ Column expectations:
         help='Minimum similarity for reporting (default: 0.4)'
     )
     
+    parser.add_argument(
+        '--semantic',
+        action='store_true',
+        help='Also print BERT-based similarity scores for every pair (slow; requires semantic_text_similarity)'
+    )
+    
     # Verbose output
     parser.add_argument(
         '-v', '--verbose',
@@ -583,7 +592,8 @@ Column expectations:
             req_data,
             toplevel_data, 
             args.high_threshold,
-            args.medium_threshold
+            args.medium_threshold,
+            semantic=args.semantic,
         )
         
         # Print results
@@ -1,5 +1,7 @@
+import csv
 import json
 import logging
+import os
 from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -13,6 +15,12 @@ log = logging.getLogger(__name__)
 
 def build_ancestry_dataframe(tracer, ancestry: Dict) -> pd.DataFrame:
     """Build the ancestry export DataFrame before writing to disk."""
+    all_columns, rows = _build_ancestry_rows(tracer, ancestry)
+    return pd.DataFrame(rows, columns=all_columns)
+
+
+def _build_ancestry_rows(tracer, ancestry: Dict) -> Tuple[List[str], List[Dict]]:
+    """Build the ancestry export column names and one dict per output row."""
     level_col_names = ["Level -1 (External)"] + [
         f"Level {i} ({label})"
         for i, label in enumerate(tracer.file_hierarchy_order)
@@ -94,7 +102,7 @@ def build_ancestry_dataframe(tracer, ancestry: Dict) -> pd.DataFrame:
 
         rows.append(row)
 
-    return pd.DataFrame(rows, columns=all_columns)
+    return all_columns, rows
 
 
 def export_ancestry_xlsx(tracer, ancestry: Dict, output_path: str) -> None:
@@ -105,13 +113,20 @@ def export_ancestry_xlsx(tracer, ancestry: Dict, output_path: str) -> None:
       - TopLevel_Definition  (definition of the closest ancestor in the path)
       - All 18 DOORS schema columns for the leaf requirement
     """
-    df = build_ancestry_dataframe(tracer, ancestry)
+    all_columns, rows = _build_ancestry_rows(tracer, ancestry)
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
     if output_path.endswith(".csv"):
-        df.to_csv(output_path, index=False, sep=";")
+        # The rows are already strings: write them directly, formatted as
+        # DataFrame.to_csv(sep=";") would, without building a DataFrame
+        with open(output_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(
+                f, fieldnames=all_columns, delimiter=";", lineterminator=os.linesep
+            )
+            writer.writeheader()
+            writer.writerows(rows)
     else:
-        df.to_excel(output_path, index=False)
-    log.info("Ancestry trace exported to '%s' (%d rows)", output_path, len(df))
+        pd.DataFrame(rows, columns=all_columns).to_excel(output_path, index=False)
+    log.info("Ancestry trace exported to '%s' (%d rows)", output_path, len(rows))
 
 
 def write_debug_files(
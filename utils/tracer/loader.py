@@ -3,16 +3,21 @@ import re
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
-from utils.constants import COLUMNS, COLUMN_MAPPING
-from utils.base_processor import Requirement
+from utils.constants import COLUMNS, COLUMN_MAPPING, COLUMN_MAPPING_KEYS
+from utils.base_processor import Requirement, REQUIREMENT_FIELD_COLUMNS
+from utils.io_helpers import get_excel_engine
 
 log = logging.getLogger(__name__)
 
 # Column aliases used when raw CSV columns don't match the DOORS schema names.
 _CSV_ALIASES = {k: v for k, v in COLUMN_MAPPING.items()}
 
+# Columns searched for a "deleted" marker, in the order they are reported
+_DELETED_MARKER_COLUMNS = [c for c in COLUMNS if c not in ("UpdatesMade", "Definition")]
+
 
 def load_requirements(
     filepath: str,
@@ -43,7 +48,11 @@ def load_requirements(
         delim = ";" if "SEMICOLON" in fname or "SC" in fname else ","
         df = pd.read_csv(filepath, sep=delim, dtype=str, keep_default_na=False)
         # Apply column aliases (case-insensitive) so DOORS names are used downstream
-        df = df.rename(columns={c: _CSV_ALIASES[c.lower()] for c in df.columns if c.lower() in _CSV_ALIASES})
+        df = df.rename(columns={
+            c: _CSV_ALIASES[key]
+            for c, key in zip(df.columns, df.columns.str.lower())
+            if key in COLUMN_MAPPING_KEYS
+        })
         if id_template:
             col_lk = {c.lower(): c for c in df.columns}
             parts = re.split(r"\{[^}]+\}", id_template)
@@ -58,7 +67,7 @@ def load_requirements(
         log.info("  Loaded %d requirements as '%s'", len(entries), label)
         return entries
 
-    excel_file = pd.ExcelFile(filepath)
+    excel_file = pd.ExcelFile(filepath, engine=get_excel_engine())
 
     if sheet:
         if sheet not in excel_file.sheet_names:
@@ -87,20 +96,15 @@ def _entries_from_df(df: pd.DataFrame, label: str, source_name: str) -> List[Dic
         log.warning("'%s' missing critical columns: %s — skipping", source_name, missing)
         return []
 
-    # Ensure all 18 schema columns exist
-    for col in COLUMNS:
-        if col not in df.columns:
-            df[col] = ""
-
-    # Normalize values
-    df[COLUMNS] = df[COLUMNS].fillna("").astype(str)
+    # Keep just the 18 schema columns (missing ones blank) and normalize values
+    df = df.reindex(columns=COLUMNS, fill_value="").fillna("").astype(str)
 
     # Collapse multi-word identifiers like "EID-A IRD 1234" into a single token
     # "EID-A-IRD-1234" before any whitespace-based tokenisation. This must run
     # on both columns so parent references stay consistent with requirement IDs.
     _eid_pat = r"(?i)\bEID-A\s+IRD\s+(\d+)\b"
-    for _col in ("RequirementID", "ParentID"):
-        df[_col] = df[_col].str.replace(_eid_pat, lambda m: f"EID-A-IRD-{m.group(1)}", regex=True)
+    _id_cols = ["RequirementID", "ParentID"]
+    df[_id_cols] = df[_id_cols].replace(_eid_pat, r"EID-A-IRD-\1", regex=True)
 
     df["RequirementID"] = (
         df["RequirementID"].str.replace(r"[\n\r]+", " ", regex=True).str.strip()
@@ -114,18 +118,17 @@ def _entries_from_df(df: pd.DataFrame, label: str, source_name: str) -> List[Dic
         .str.replace(r" +", "\n", regex=True)
     )
 
-    # Detect rows containing "deleted" in any column (except UpdatesMade, Definition)
-    df["_deleted"] = df[COLUMNS].apply(
-        lambda row: next(
-            (
-                col
-                for col in COLUMNS
-                if "deleted" in str(row[col]).lower()
-                and col not in ("UpdatesMade", "Definition")
-            ),
-            "",
-        ),
-        axis=1,
+    # Detect rows containing "deleted" in any column (except UpdatesMade,
+    # Definition): each column is lowercased and searched in one vectorized
+    # pass, and a row reports the first column that matched
+    hits = np.column_stack([
+        df[col].str.lower().str.contains("deleted", regex=False).to_numpy(dtype=bool)
+        for col in _DELETED_MARKER_COLUMNS
+    ])
+    df["_deleted"] = np.where(
+        hits.any(axis=1),
+        np.array(_DELETED_MARKER_COLUMNS, dtype=object)[hits.argmax(axis=1)],
+        "",
     )
 
     # Drop empty IDs, explode multi-value RequirementID
@@ -137,32 +140,16 @@ def _entries_from_df(df: pd.DataFrame, label: str, source_name: str) -> List[Dic
     req_df["_req_ids"] = req_df["_req_ids"].str.strip()
     req_df = req_df.set_index("_req_ids")
 
-    entries: List[Dict] = []
-    for req_id, row in req_df.iterrows():
-        req = Requirement(
-            requirement_id=req_id,
-            parent_id=row["ParentID"],
-            type=row["Type"],
-            sub_type=row["SubType"],
-            title=row["Title"],
-            definition=row["Definition"],
-            notes=row["Notes"],
-            remarks=row["Remarks"],
-            responsibility=row["Responsibility"],
-            subsystem_applicability=row["SubSysApplicability"],
-            applicability=row["Applicability"],
-            compliance=row["Compliance"],
-            compliance_notes=row["ComplianceNotes"],
-            verification=row["Verification"],
-            verification_notes=row["VerificationNotes"],
-            reference_document=row["ReferenceDocument"],
-            original_esa_identifier=row["OriginalESAIdentifier"],
-            updates_made=row["UpdatesMade"],
-        )
-        entries.append({
-            "requirement": req,
-            "deleted": row["_deleted"],
+    # Read the frame column by column (no per-row Series as with iterrows);
+    # Requirement takes its fields positionally in REQUIREMENT_FIELD_COLUMNS
+    # order, with each exploded ID as its RequirementID
+    req_df["RequirementID"] = req_df.index
+    field_columns = [req_df[col].tolist() for col in REQUIREMENT_FIELD_COLUMNS]
+    return [
+        {
+            "requirement": Requirement(*values),
+            "deleted": deleted,
             "label": label,
-        })
-
-    return entries
+        }
+        for deleted, *values in zip(req_df["_deleted"], *field_columns)
+    ]
@@ -10,7 +10,7 @@ from typing import Dict, Optional, Tuple
 from requirements_processor import process_single_file
 from utils.tracer.config import SourceEntry, TracerConfig, load_config, slugify_label
 from requirements_tracer import run_trace
-from utils import FileCache
+from utils import FileCache, get_cache
 
 log = logging.getLogger(__name__)
 
@@ -32,7 +32,7 @@ def run_normalize_and_trace(
     ).resolve()
     normalized_output_dir.mkdir(parents=True, exist_ok=True)
 
-    cache = FileCache()
+    cache = get_cache()
     generated_config = _build_generated_config(
         config=config,
         normalized_dir=normalized_output_dir,